@@ -0,0 +1,90 @@
+#!/usr/bin/env python3
+"""
+Checklist Generator Benchmark
+=============================
+
+Times each output format rendering into the shared list buffer, and every
+format in one pass, for synthetic configs of growing size, and prints the
+cost per item. Each emitter is timed on its own after a warm-up run, with
+the garbage collector paused, so only the renderer under test is measured.
+Rendering is linear when the ratio stays small (cache effects make it drift
+up as output grows); quadratic rendering would grow with the item count.
+
+Usage:
+    python3 benchmark_checklist.py [max_items]
+
+Default: 100000 items (split across every list section).
+"""
+
+import gc
+import sys
+import time
+
+from generate_checklist import EMITTERS, LIST_TYPES, Renderer, build_checklist, emit
+
+def make_data(items):
+    """Config dict with ``items`` entries spread evenly over the list sections."""
+    per_type = max(1, items // len(LIST_TYPES))
+    data = {'project_name': 'Benchmark', 'environment': 'Production'}
+    for type_val in LIST_TYPES:
+        if type_val == 'production_prs':
+            data[type_val] = [f'https://github.com/org/repo/pull/{i}' for i in range(per_type)]
+        else:
+            data[type_val] = [f'{type_val} item {i}' for i in range(per_type)]
+    return data
+
+def best_of(fn, repeat):
+    """Fastest of ``repeat`` runs after one warm-up, with GC paused while timing."""
+    fn()
+    best = float('inf')
+    enabled = gc.isenabled()
+    gc.disable()
+    try:
+        for _ in range(repeat):
+            gc.collect()
+            start = time.perf_counter()
+            fn()
+            best = min(best, time.perf_counter() - start)
+    finally:
+        if enabled:
+            gc.enable()
+    return best
+
+def render_with(checklist, classes):
+    """Render ``classes`` in one pass into list buffers; returns total characters."""
+    outs = [Renderer() for _ in classes]
+    emit(checklist, [cls(out) for cls, out in zip(classes, outs)])
+    return sum(len(out.getvalue()) for out in outs)
+
+def main():
+    max_items = int(sys.argv[1]) if len(sys.argv) > 1 else 100000
+    sizes = []
+    n = 1000
+    while n <= max_items:
+        sizes.append(n)
+        n *= 10
+
+    columns = [(name, [cls]) for name, cls in EMITTERS.items()]
+    columns.append(('all', list(EMITTERS.values())))
+
+    print("📊 Checklist Rendering Benchmark (µs per item)")
+    print("=" * 40)
+    print(f"{'items':>10}" + ''.join(f" {name:>8}" for name, _ in columns) + f" {'MB out':>8}")
+
+    first = None
+    for items in sizes:
+        checklist = build_checklist(make_data(items))
+        repeat = max(3, 100000 // items)
+        costs = [best_of(lambda: render_with(checklist, classes), repeat) / items * 1e6 for _, classes in columns]
+        size = render_with(checklist, columns[-1][1])
+        first = first or costs
+        print(f"{items:>10}" + ''.join(f" {cost:>8.2f}" for cost in costs) + f" {size / 1e6:>8.1f}")
+
+    print(f"\nPer-item cost at {sizes[-1]} items vs {sizes[0]} (quadratic rendering would be ~{sizes[-1] // sizes[0]}x):")
+    for (name, _), cost, base in zip(columns, costs, first):
+        print(f"  {name:>8}: {cost / base:.2f}x")
+    print("'all' renders every format in a single pass over the sections")
+    return 0
+
+if __name__ == "__main__":
+    exit(main())
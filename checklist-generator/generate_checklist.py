@@ -6,7 +6,10 @@ Generic Deployment Checklist Generator
 A simple tool to generate interactive HTML and Markdown deployment checklists from CSV configuration.
 
 Usage:
-    python3 generate_checklist.py [config.csv] [output_name]
+    python3 generate_checklist.py [config.csv] [output_name] [--formats html,md,json,txt]
+    python3 generate_checklist.py huge_config.csv release --stream
+    python3 generate_checklist.py config.csv checklist --watch
+    python3 generate_checklist.py --batch configs/ 'envs/*/*.csv' manifest.txt [--out-dir DIR] [-j N]
 
 Default files:
     - Input: checklist_config.csv
@@ -18,16 +21,221 @@ CSV Format:
     features,"Feature 1,Feature 2,Feature 3"
     services,"Service 1,Service 2"
     ...
+
+List types may also repeat, one item (or a few) per row; their items
+accumulate in row order:
+    production_prs,https://github.com/org/repo/pull/1
+    production_prs,https://github.com/org/repo/pull/2
+
+The CSV is parsed once into a Checklist (sections of items). Every requested
+format is an emitter over that model, and all of them are fed in a single
+pass over the sections.
 """
 
+import argparse
 import csv
-import sys
+import glob
+import hashlib
+import json
 import os
+import re
+import stat
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
 
-def generate_html(data, project_name):
-    """Generate HTML checklist."""
+LIST_TYPES = ['features', 'services', 'health_checks', 'commands', 'bg_commands', 'tasks', 'pre_deployment', 'post_deployment', 'production_prs']
+
+INFO_FIELDS = [
+    ('release_date', 'Release Date'),
+    ('environment', 'Environment'),
+    ('deployed_by', 'Deployed By'),
+    ('deployment_time', 'Deployment Time'),
+]
+
+DEFAULT_RELEASE_NOTES = 'No additional notes for this release.'
+
+def source_fingerprint():
+    """Hash of this script, so cached builds expire whenever the generator changes."""
+    with open(os.path.abspath(__file__), 'rb') as f:
+        return hashlib.sha256(f.read()).hexdigest()[:16]
+
+# Part of every build-cache entry: any edit to the generator invalidates old outputs
+GENERATOR_VERSION = source_fingerprint()
+
+# Checklist sections in output order:
+# (type, title, icon, heading level, group (icon, title) shown above it, item kind, id prefix, always shown)
+SECTION_SPECS = [
+    ('features', 'Changes Included', '🚀', 2, None, 'list', 'f', False),
+    ('pre_deployment', 'Code Preparation', '', 3, ('✅', 'Pre-Deployment Checklist'), 'check', 'pre', True),
+    ('production_prs', 'Production PRs', '', 3, None, 'pr', 'pr', False),
+    ('services', 'Service Deployment', '', 3, ('🔧', 'Deployment Steps'), 'check', 's', False),
+    ('post_deployment', 'Post-Deployment Verification', '', 3, None, 'check', 'post', True),
+    ('health_checks', 'Health Checks', '🏥', 2, None, 'check', 'h', False),
+    ('commands', 'Management Commands', '⚡', 2, None, 'command', 'c', False),
+    ('bg_commands', 'Background Commands', '', 3, None, 'command', 'b', False),
+    ('tasks', 'Additional Tasks', '📝', 2, None, 'check', 't', False),
+]
+
+# Items used when an always-shown section is not configured
+DEFAULT_ITEMS = {
+    'pre_deployment': ['Code reviewed and approved', 'All tests passing', 'Database/system backup created'],
+    'post_deployment': ['Application starts successfully', 'Core functionality tested', 'Performance within acceptable limits', 'Logs checked for errors'],
+}
+
+STATUS_OPTIONS = ['✅ Deployment Successful', '⚠️ Partial Success (with issues)', '❌ Deployment Failed', '🔄 Rolled Back']
+
+# ---------- Checklist Model ----------
+
+class Item:
+    """One line of a section: a checklist entry, feature, PR or command."""
+    
+    __slots__ = ('id', 'text', 'value', 'url', 'ref')
+    
+    def __init__(self, id, text, value=None, url=None, ref=None):
+        self.id = id
+        self.text = text
+        self.value = text if value is None else value
+        self.url = url
+        self.ref = ref
+    
+    def as_dict(self):
+        d = {'id': self.id, 'text': self.text}
+        if self.url:
+            d['url'] = self.url
+            d['ref'] = self.ref
+        return d
+
+class Section:
+    """A titled group of items; ``defaulted`` when the items are built-in defaults.
+
+    ``values`` is any re-iterable sequence with a length (a list, or a Spool
+    in streaming mode). Items are built from it on the fly each time the
+    section is traversed, so a huge section never sits in memory as objects.
+    """
+    
+    def __init__(self, key, title, icon, level, group, kind, prefix, values, defaulted=False):
+        self.key = key
+        self.title = title
+        self.icon = icon
+        self.level = level
+        self.group = group
+        self.kind = kind
+        self.prefix = prefix
+        self.values = values
+        self.defaulted = defaulted
+    
+    def __len__(self):
+        return len(self.values)
+    
+    @property
+    def heading(self):
+        return f"{self.icon} {self.title}" if self.icon else self.title
+    
+    @property
+    def items(self):
+        prefix = self.prefix
+        if self.kind == 'pr':
+            return (pr_item(i, v) for i, v in enumerate(self.values, 1))
+        if self.key == 'services':
+            return (Item(f'{prefix}{i}', f'Deploy {v}', value=v) for i, v in enumerate(self.values, 1))
+        return (Item(f'{prefix}{i}', v) for i, v in enumerate(self.values, 1))
+    
+    def header(self):
+        """Section fields without the items."""
+        return {
+            'key': self.key,
+            'title': self.title,
+            'group': self.group[1] if self.group else None,
+            'kind': self.kind,
+            'defaulted': self.defaulted,
+        }
+    
+    def as_dict(self):
+        return dict(self.header(), items=[item.as_dict() for item in self.items])
+
+class Checklist:
+    """Everything the emitters need, built once from the CSV data."""
+    
+    def __init__(self, project_name, info, sections, release_notes):
+        self.project_name = project_name
+        self.info = info
+        self.sections = sections
+        self.release_notes = release_notes
+
+def pr_item(i, pr_url):
+    pr_number = pr_url.split('/')[-1] if '/' in pr_url else f'PR-{i}'
+    return Item(f'pr{i}', f'#{pr_number}', value=pr_url, url=pr_url, ref=pr_number)
+
+def build_section(spec, values):
+    key, title, icon, level, group, kind, prefix, _ = spec
+    defaulted = not values
+    if defaulted:
+        values = DEFAULT_ITEMS[key]
+    return Section(key, title, icon, level, group, kind, prefix, values, defaulted)
+
+def build_checklist(data, project_name=None):
+    """Turn parsed CSV ``data`` into a Checklist."""
+    sections = []
+    for spec in SECTION_SPECS:
+        values = data.get(spec[0])
+        if values or spec[7]:
+            sections.append(build_section(spec, values))
+    return Checklist(
+        project_name or data.get('project_name', 'Deployment Project'),
+        [(label, data.get(key, 'TBD')) for key, label in INFO_FIELDS],
+        sections,
+        data.get('release_notes', DEFAULT_RELEASE_NOTES),
+    )
+
+# ---------- Emitters ----------
+
+class Renderer:
+    """Output buffer shared by the emitters.
+
+    Fragments are appended to a list and joined once, so rendering stays
+    linear in the number of items instead of copying the document per append.
+    """
     
-    html = f'''<!DOCTYPE html>
+    def __init__(self):
+        self.parts = []
+        self.write = self.parts.append
+    
+    def getvalue(self):
+        return ''.join(self.parts)
+
+class Emitter:
+    """Writes one output format to ``out`` (anything with a ``write`` method).
+
+    ``emit`` calls ``begin`` once; then, for each section in order,
+    ``start_section``, ``item`` per item and ``end_section``; then ``end``.
+    Items arrive one at a time and are never revisited, so subclasses only
+    format and hold no per-item state.
+    """
+    
+    name = ''
+    label = ''
+    extension = ''
+    
+    def __init__(self, out):
+        self.w = out.write
+    
+    def begin(self, checklist):
+        pass
+    
+    def start_section(self, section):
+        pass
+    
+    def item(self, section, item):
+        pass
+    
+    def end_section(self, section):
+        pass
+    
+    def end(self, checklist):
+        pass
+
+HTML_HEAD = '''<!DOCTYPE html>
 <html lang="en">
 <head>
     <meta charset="UTF-8">
@@ -283,191 +491,9 @@ def generate_html(data, project_name):
     <div class="progress-text" style="text-align: center; margin-bottom: 20px;">0 of 0 tasks completed (0%)</div>
     
     <h2>📋 Release Information</h2>
-    <div class="info-grid">
-        <div class="info-item">
-            <span class="info-label">Release Date</span>
-            {data.get('release_date', 'TBD')}
-        </div>
-        <div class="info-item">
-            <span class="info-label">Environment</span>
-            {data.get('environment', 'TBD')}
-        </div>
-        <div class="info-item">
-            <span class="info-label">Deployed By</span>
-            {data.get('deployed_by', 'TBD')}
-        </div>
-        <div class="info-item">
-            <span class="info-label">Deployment Time</span>
-            {data.get('deployment_time', 'TBD')}
-        </div>
-    </div>'''
-    
-    # Add features section (non-checklist)
-    if data.get('features'):
-        html += '''
-    
-    <h2>🚀 Changes Included</h2>
-    <ul>'''
-        
-        for feature in data['features']:
-            html += f'''
-        <li>{feature}</li>'''
-        
-        html += '''
-    </ul>'''
-    
-    # Pre-deployment section
-    html += '''
-    
-    <h2>✅ Pre-Deployment Checklist</h2>
-    <h3>Code Preparation</h3>'''
-    
-    if data.get('pre_deployment'):
-        for i, item in enumerate(data['pre_deployment'], 1):
-            html += f'''
-    <div class="checkbox-item">
-        <input type="checkbox" id="pre{i}" onchange="updateProgress()">
-        <label for="pre{i}">{item}</label>
-    </div>'''
-    else:
-        # Default items if not configured
-        html += '''
-    <div class="checkbox-item">
-        <input type="checkbox" id="code-review" onchange="updateProgress()">
-        <label for="code-review">Code reviewed and approved</label>
-    </div>
-    <div class="checkbox-item">
-        <input type="checkbox" id="tests-pass" onchange="updateProgress()">
-        <label for="tests-pass">All tests passing</label>
-    </div>'''
-    
-    # Production PRs section
-    if data.get('production_prs'):
-        html += '''
-    
-    <h3>Production PRs</h3>'''
-        
-        for i, pr_url in enumerate(data['production_prs'], 1):
-            pr_number = pr_url.split('/')[-1] if '/' in pr_url else f'PR-{i}'
-            html += f'''
-    <div class="checkbox-item">
-        <input type="checkbox" id="pr{i}" onchange="updateProgress()">
-        <label for="pr{i}"><a href="{pr_url}" target="_blank" title="{pr_url.split('/root/')[-1].split('/')[0]}/{pr_url.split('/')[-2]} #{pr_number}">{pr_url.split('/root/')[-1].split('/')[0]}/{pr_url.split('/')[-2]} #{pr_number}</a> - Reviewed and Merged</label>
-    </div>'''
-    
-    # Services deployment section
-    if data.get('services'):
-        html += '''
-    
-    <h2>🔧 Deployment Steps</h2>
-    <h3>Service Deployment</h3>'''
-        
-        for i, service in enumerate(data['services'], 1):
-            html += f'''
-    <div class="checkbox-item">
-        <input type="checkbox" id="s{i}" onchange="updateProgress()">
-        <label for="s{i}">Deploy {service}</label>
-    </div>'''
-    
-    # Post-deployment verification
-    html += '''
-    
-    <h3>Post-Deployment Verification</h3>'''
-    
-    if data.get('post_deployment'):
-        for i, item in enumerate(data['post_deployment'], 1):
-            html += f'''
-    <div class="checkbox-item">
-        <input type="checkbox" id="post{i}" onchange="updateProgress()">
-        <label for="post{i}">{item}</label>
-    </div>'''
-    else:
-        # Default items if not configured
-        html += '''
-    <div class="checkbox-item">
-        <input type="checkbox" id="app-starts" onchange="updateProgress()">
-        <label for="app-starts">Application starts successfully</label>
-    </div>
-    <div class="checkbox-item">
-        <input type="checkbox" id="functionality-test" onchange="updateProgress()">
-        <label for="functionality-test">Core functionality tested</label>
-    </div>
-    <div class="checkbox-item">
-        <input type="checkbox" id="logs-check" onchange="updateProgress()">
-        <label for="logs-check">Logs checked for errors</label>
-    </div>'''
-    
-    # Health checks section
-    if data.get('health_checks'):
-        html += '''
-    
-    <h2>🏥 Health Checks</h2>'''
-        
-        for i, health in enumerate(data['health_checks'], 1):
-            html += f'''
-    <div class="checkbox-item">
-        <input type="checkbox" id="h{i}" onchange="updateProgress()">
-        <label for="h{i}">{health}</label>
-    </div>'''
-    
-    # Commands section
-    if data.get('commands'):
-        html += '''
-    
-    <h2>⚡ Management Commands</h2>'''
-        
-        for i, cmd in enumerate(data['commands'], 1):
-            escaped_cmd = cmd.replace("'", "\\'")
-            html += f'''
-    <div class="checkbox-item">
-        <input type="checkbox" id="c{i}" onchange="updateProgress()">
-        <label for="c{i}">
-            <div class="code-container">
-                <code>{cmd}</code>
-                <button class="copy-btn" onclick="copyToClipboard('{escaped_cmd}')">📋</button>
-            </div>
-        </label>
-    </div>'''
-    
-    # Background commands section
-    if data.get('bg_commands'):
-        html += '''
-    
-    <h3>Background Commands</h3>'''
-        
-        for i, cmd in enumerate(data['bg_commands'], 1):
-            escaped_cmd = cmd.replace("'", "\\'")
-            html += f'''
-    <div class="checkbox-item">
-        <input type="checkbox" id="b{i}" onchange="updateProgress()">
-        <label for="b{i}">
-            <div class="code-container">
-                <code>{cmd}</code>
-                <button class="copy-btn" onclick="copyToClipboard('{escaped_cmd}')">📋</button>
-            </div>
-        </label>
-    </div>'''
-    
-    # Additional tasks section
-    if data.get('tasks'):
-        html += '''
-    
-    <h2>📝 Additional Tasks</h2>'''
-        
-        for i, task in enumerate(data['tasks'], 1):
-            html += f'''
-    <div class="checkbox-item">
-        <input type="checkbox" id="t{i}" onchange="updateProgress()">
-        <label for="t{i}">{task}</label>
-    </div>'''
-    
-    # Notes and status section
-    html += f'''
-    
-    <h2>📄 Release Notes</h2>
-    <p><em>{data.get('release_notes', 'No additional notes for this release.')}</em></p>
-    
-    <div class="status-section">
+    <div class="info-grid">'''
+
+HTML_FOOT = '''    <div class="status-section">
         <h2>🎯 Deployment Status</h2>
         <div style="margin: 20px 0;">
             <div class="checkbox-item">
@@ -496,205 +522,770 @@ def generate_html(data, project_name):
     </div>
 </body>
 </html>'''
+
+# The HTML page keeps its own shorter defaults, with stable ids for saved progress
+HTML_DEFAULT_ITEMS = {
+    'pre_deployment': [('code-review', 'Code reviewed and approved'), ('tests-pass', 'All tests passing')],
+    'post_deployment': [('app-starts', 'Application starts successfully'), ('functionality-test', 'Core functionality tested'), ('logs-check', 'Logs checked for errors')],
+}
+
+class HtmlEmitter(Emitter):
+    """Interactive HTML page with progress tracking."""
+    
+    name = 'html'
+    label = 'HTML'
+    extension = '.html'
+    
+    def begin(self, checklist):
+        w = self.w
+        w(HTML_HEAD.format(project_name=checklist.project_name))
+        for label, value in checklist.info:
+            w(f'''
+        <div class="info-item">
+            <span class="info-label">{label}</span>
+            {value}
+        </div>''')
+        w('''
+    </div>''')
+    
+    def start_section(self, section):
+        w = self.w
+        if section.group:
+            w(f'''
     
-    return html
+    <h2>{section.group[0]} {section.group[1]}</h2>
+    <h3>{section.title}</h3>''')
+        else:
+            w(f'''
+    
+    <h{section.level}>{section.heading}</h{section.level}>''')
+        
+        if section.kind == 'list':
+            w('''
+    <ul>''')
+        elif section.defaulted:
+            for item_id, label in HTML_DEFAULT_ITEMS[section.key]:
+                self.checkbox(item_id, label)
+    
+    def item(self, section, item):
+        if section.kind == 'list':
+            self.w(f'''
+        <li>{item.text}</li>''')
+        elif section.defaulted:
+            pass  # the page's own defaults were written with the heading
+        elif section.kind == 'pr':
+            self.checkbox(item.id, self.pr_label(item))
+        elif section.kind == 'command':
+            self.checkbox(item.id, self.command_label(item.text))
+        else:
+            self.checkbox(item.id, item.text)
+    
+    def end_section(self, section):
+        if section.kind == 'list':
+            self.w('''
+    </ul>''')
+    
+    def checkbox(self, item_id, label):
+        self.w(f'''
+    <div class="checkbox-item">
+        <input type="checkbox" id="{item_id}" onchange="updateProgress()">
+        <label for="{item_id}">{label}</label>
+    </div>''')
+    
+    @staticmethod
+    def pr_label(item):
+        pr_url = item.url
+        text = f"{pr_url.split('/root/')[-1].split('/')[0]}/{pr_url.split('/')[-2]} #{item.ref}" if '/' in pr_url else item.text
+        return f'<a href="{pr_url}" target="_blank" title="{text}">{text}</a> - Reviewed and Merged'
+    
+    @staticmethod
+    def command_label(cmd):
+        escaped_cmd = cmd.replace("'", "\\'")
+        return f'''
+            <div class="code-container">
+                <code>{cmd}</code>
+                <button class="copy-btn" onclick="copyToClipboard('{escaped_cmd}')">📋</button>
+            </div>
+        '''
+    
+    def end(self, checklist):
+        self.w(f'''
+    
+    <h2>📄 Release Notes</h2>
+    <p><em>{checklist.release_notes}</em></p>
+    
+''')
+        self.w(HTML_FOOT)
 
-def generate_markdown(data, project_name):
-    """Generate Markdown checklist for Git repositories."""
+class MarkdownEmitter(Emitter):
+    """Markdown checklist for Git repositories."""
+    
+    name = 'md'
+    label = 'Markdown'
+    extension = '.md'
     
-    md = f'''# {project_name} - Deployment Checklist
+    # Sections whose items follow their heading directly, without a blank line
+    COMPACT = ('pre_deployment', 'production_prs', 'services', 'post_deployment')
+    
+    def begin(self, checklist):
+        w = self.w
+        w(f'''# {checklist.project_name} - Deployment Checklist
 
 ## 📋 Release Information
 
-- **Release Date**: {data.get('release_date', 'TBD')}
-- **Environment**: {data.get('environment', 'TBD')}
-- **Deployed By**: {data.get('deployed_by', 'TBD')}
-- **Deployment Time**: {data.get('deployment_time', 'TBD')}
-
-'''
+''')
+        for label, value in checklist.info:
+            w(f'- **{label}**: {value}\n')
+        w('\n')
     
-    # Add features section (non-checklist)
-    if data.get('features'):
-        md += '''## 🚀 Changes Included
+    def start_section(self, section):
+        w = self.w
+        if section.group:
+            w(f'## {section.group[0]} {section.group[1]}\n\n')
+        w(f"{'#' * section.level} {section.heading}\n")
+        if section.key not in self.COMPACT:
+            w('\n')
+    
+    def item(self, section, item):
+        if section.kind == 'list':
+            self.w(f'- {item.text}\n')
+        elif section.kind == 'pr':
+            self.w(f'- [ ] [#{item.ref}]({item.url}) - Merged and verified\n')
+        elif section.kind == 'command':
+            self.w(f'- [ ] `{item.text}`\n')
+        else:
+            self.w(f'- [ ] {item.text}\n')
+    
+    def end_section(self, section):
+        self.w('\n')
+    
+    def end(self, checklist):
+        w = self.w
+        w(f'''## 📄 Release Notes
+
+{checklist.release_notes}
 
-'''
-        for feature in data['features']:
-            md += f'- {feature}\n'
-        md += '\n'
+## 🎯 Deployment Status
+
+''')
+        for option in STATUS_OPTIONS:
+            w(f'- [ ] {option}\n')
+        w('''
+**Final Sign-off**: _________________ **Date**: _________
+
+---
+
+*Generated by [Generic Deployment Checklist Generator](https://github.com/your-repo/deployment-checklist)*
+''')
+
+class JsonEmitter(Emitter):
+    """Machine-readable checklist; sections are written as they arrive."""
     
-    # Pre-deployment section
-    md += '''## ✅ Pre-Deployment Checklist
+    name = 'json'
+    label = 'JSON'
+    extension = '.json'
+    
+    def begin(self, checklist):
+        self.first = True
+        info = {label: value for label, value in checklist.info}
+        self.w('{\n'
+               f'  "project_name": {json.dumps(checklist.project_name, ensure_ascii=False)},\n'
+               f'  "info": {json.dumps(info, ensure_ascii=False)},\n'
+               '  "sections": [')
+    
+    def start_section(self, section):
+        # The header object is reopened to append "items", which follow one per line
+        header = json.dumps(section.header(), ensure_ascii=False)
+        self.w(('\n    ' if self.first else ',\n    ') + header[:-1] + ', "items": [')
+        self.first = False
+        self.first_item = True
+    
+    def item(self, section, item):
+        self.w(('\n      ' if self.first_item else ',\n      ') + json.dumps(item.as_dict(), ensure_ascii=False))
+        self.first_item = False
+    
+    def end_section(self, section):
+        self.w(']}' if self.first_item else '\n    ]}')
+    
+    def end(self, checklist):
+        self.w('\n  ],\n'
+               f'  "release_notes": {json.dumps(checklist.release_notes, ensure_ascii=False)},\n'
+               f'  "status_options": {json.dumps(STATUS_OPTIONS, ensure_ascii=False)}\n'
+               '}\n')
 
-### Code Preparation
-'''
+class TextEmitter(Emitter):
+    """Plain-text checklist for terminals, tickets and chat."""
     
-    if data.get('pre_deployment'):
-        for item in data['pre_deployment']:
-            md += f'- [ ] {item}\n'
-    else:
-        # Default items if not configured
-        md += '''- [ ] Code reviewed and approved
-- [ ] All tests passing
-- [ ] Database/system backup created
-'''
-    
-    # Production PRs section
-    if data.get('production_prs'):
-        md += '''
-### Production PRs
-'''
-        for i, pr_url in enumerate(data['production_prs'], 1):
-            pr_number = pr_url.split('/')[-1] if '/' in pr_url else f'PR-{i}'
-            md += f'- [ ] [#{pr_number}]({pr_url}) - Merged and verified\n'
-    
-    md += '\n'
-    
-    # Services deployment section
-    if data.get('services'):
-        md += '''## 🔧 Deployment Steps
-
-### Service Deployment
-'''
-        for service in data['services']:
-            md += f'- [ ] Deploy {service}\n'
-        md += '\n'
-    
-    # Post-deployment verification
-    md += '''### Post-Deployment Verification
-'''
-    
-    if data.get('post_deployment'):
-        for item in data['post_deployment']:
-            md += f'- [ ] {item}\n'
-    else:
-        # Default items if not configured
-        md += '''- [ ] Application starts successfully
-- [ ] Core functionality tested
-- [ ] Performance within acceptable limits
-- [ ] Logs checked for errors
-'''
+    name = 'txt'
+    label = 'Text'
+    extension = '.txt'
     
-    md += '\n'
+    def heading(self, title):
+        self.w(f'\n{title.upper()}\n{"-" * len(title)}\n')
     
-    # Health checks section
-    if data.get('health_checks'):
-        md += '''## 🏥 Health Checks
+    def begin(self, checklist):
+        title = f'{checklist.project_name} - Deployment Checklist'
+        self.w(f'{title}\n{"=" * len(title)}\n\n')
+        for label, value in checklist.info:
+            self.w(f'{label}: {value}\n')
+    
+    def start_section(self, section):
+        if section.group:
+            self.heading(section.group[1])
+        if section.level == 2:
+            self.heading(section.title)
+        else:
+            self.w(f'\n{section.title}:\n')
+    
+    def item(self, section, item):
+        if section.kind == 'list':
+            self.w(f'  - {item.text}\n')
+        elif section.kind == 'pr':
+            self.w(f'  [ ] {item.text} ({item.url})\n')
+        elif section.kind == 'command':
+            self.w(f'  [ ] $ {item.text}\n')
+        else:
+            self.w(f'  [ ] {item.text}\n')
+    
+    def end(self, checklist):
+        self.heading('Release Notes')
+        self.w(f'{checklist.release_notes}\n')
+        self.heading('Deployment Status')
+        for option in STATUS_OPTIONS:
+            self.w(f'  [ ] {option}\n')
+        self.w('\nFinal sign-off: _________________  Date: _________\n')
+
+EMITTERS = {cls.name: cls for cls in (HtmlEmitter, MarkdownEmitter, JsonEmitter, TextEmitter)}
+DEFAULT_FORMATS = ['html', 'md']
+
+def emit(checklist, emitters):
+    """Feed every emitter in one pass over the sections; return the item count.
+
+    Each item is built once and handed to all emitters before the next one
+    is read, so memory stays flat however long the sections are.
+    """
+    count = 0
+    for emitter in emitters:
+        emitter.begin(checklist)
+    for section in checklist.sections:
+        for emitter in emitters:
+            emitter.start_section(section)
+        for item in section.items:
+            for emitter in emitters:
+                emitter.item(section, item)
+            count += 1
+        for emitter in emitters:
+            emitter.end_section(section)
+    for emitter in emitters:
+        emitter.end(checklist)
+    return count
+
+def render(emitter_cls, checklist):
+    """Render one format to a string."""
+    out = Renderer()
+    emit(checklist, [emitter_cls(out)])
+    return out.getvalue()
+
+def generate_html(data, project_name):
+    """Generate HTML checklist."""
+    return render(HtmlEmitter, build_checklist(data, project_name))
+
+def generate_markdown(data, project_name):
+    """Generate Markdown checklist for Git repositories."""
+    return render(MarkdownEmitter, build_checklist(data, project_name))
+
+# ---------- Config ----------
+
+# Comma-separated list items, matched lazily so a huge cell is never copied into a list
+ITEM_REGEX = re.compile(r'[^,]+')
+
+# Streaming mode keeps this many bytes of each list section in memory before spilling to disk
+SPOOL_MAX_BYTES = 1024 * 1024
 
-'''
-        for health in data['health_checks']:
-            md += f'- [ ] {health}\n'
-        md += '\n'
+def iter_config(csv_file):
+    """Yield ``(type, value)`` pairs: one per scalar row and one per list item.
+
+    List cells are split on commas. A list type may repeat over many rows
+    (for example one PR per row); its items accumulate in row order.
+    """
+    with open(csv_file, 'r', encoding='utf-8') as f:
+        reader = csv.DictReader(f)
+        for row in reader:
+            type_val = row['type'].strip()
+            values = row['values'].strip()
+            
+            if type_val in LIST_TYPES:
+                for m in ITEM_REGEX.finditer(values):
+                    value = m.group().strip()
+                    if value:
+                        yield type_val, value
+            else:
+                yield type_val, values
+
+class Spool:
+    """Append-only sequence of strings that spills to a temp file past ``max_size`` bytes.
+
+    Values are appended while the CSV is read and iterated afterwards; it
+    can be iterated any number of times, but not while appending.
+    """
+    
+    def __init__(self, max_size=SPOOL_MAX_BYTES):
+        self.file = tempfile.SpooledTemporaryFile(max_size=max_size, mode='w+', encoding='utf-8')
+        self.count = 0
+    
+    def append(self, value):
+        self.file.write(json.dumps(value, ensure_ascii=False))  # one line per value, newlines escaped
+        self.file.write('\n')
+        self.count += 1
+    
+    def __len__(self):
+        return self.count
+    
+    def __iter__(self):
+        self.file.seek(0)
+        for line in self.file:
+            yield json.loads(line)
     
-    # Commands section
-    if data.get('commands'):
-        md += '''## ⚡ Management Commands
+    def close(self):
+        self.file.close()
+
+def read_config(csv_file, stream=False):
+    """Parse the type,values CSV into a dict; list types become lists of strings.
+
+    With ``stream`` list items go into a Spool per type instead, so memory
+    stays bounded however many items the config has; call ``close_config``
+    when done.
+    """
+    data = {}
+    for type_val, value in iter_config(csv_file):
+        if type_val in LIST_TYPES:
+            items = data.get(type_val)
+            if items is None:
+                items = data[type_val] = Spool() if stream else []
+            items.append(value)
+        else:
+            data[type_val] = value
+    return data
+
+def close_config(data):
+    for value in data.values():
+        if isinstance(value, Spool):
+            value.close()
+
+# ---------- Output ----------
+
+def output_mode(path):
+    """Permissions for a new ``path``: those of the file it replaces, else what ``open(path, 'w')`` gives."""
+    try:
+        return stat.S_IMODE(os.stat(path).st_mode)
+    except OSError:
+        umask = os.umask(0)
+        os.umask(umask)
+        return 0o666 & ~umask
 
-'''
-        for cmd in data['commands']:
-            md += f'- [ ] `{cmd}`\n'
-        md += '\n'
+def write_outputs(checklist, output_name, formats):
+    """Render ``formats`` in one pass into temp files, then move each into place.
+
+    Readers never see a half-written checklist: every output is complete
+    before it replaces the old file, and nothing is replaced if rendering
+    fails. Returns ``([(emitter class, path, bytes written)], item count)``.
+    """
+    outputs = [(EMITTERS[name], f"{output_name}{EMITTERS[name].extension}") for name in formats]
+    temps = []
+    try:
+        for _, path in outputs:
+            fd, tmp = tempfile.mkstemp(dir=os.path.dirname(os.path.abspath(path)), prefix='.' + os.path.basename(path) + '.', suffix='.tmp')
+            temps.append((os.fdopen(fd, 'w', encoding='utf-8'), tmp))
+        items = emit(checklist, [cls(f) for (cls, _), (f, _) in zip(outputs, temps)])
+        for f, _ in temps:
+            f.close()
+        written = []
+        for (cls, path), (_, tmp) in zip(outputs, temps):
+            os.chmod(tmp, output_mode(path))
+            os.replace(tmp, path)
+            written.append((cls, path, os.path.getsize(path)))
+        return written, items
+    except BaseException:
+        for f, tmp in temps:
+            f.close()
+            if os.path.exists(tmp):
+                os.unlink(tmp)
+        raise
+
+def generate_one(csv_file, output_name, formats, stream=False, force=False):
+    """Read one config and write its out-of-date checklists.
+
+    Returns ``(outputs written, item count, paths already up to date)``;
+    without ``force``, formats whose build-cache entry still matches are
+    neither rendered nor written.
+    """
+    digest = file_sha256(csv_file)
+    cache = load_build_cache(output_name)
+    stale = formats if force else stale_formats(cache, digest, output_name, formats)
+    fresh = [f"{output_name}{EMITTERS[name].extension}" for name in formats if name not in stale]
+    if not stale:
+        return [], 0, fresh
     
-    # Background commands section
-    if data.get('bg_commands'):
-        md += '''### Background Commands
+    data = read_config(csv_file, stream)
+    try:
+        written, items = write_outputs(build_checklist(data), output_name, stale)
+    finally:
+        close_config(data)
+    save_build_cache(output_name, digest, written, cache)
+    return written, items, fresh
+
+# ---------- Build Cache ----------
+
+def file_sha256(path):
+    h = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(1 << 20), b''):
+            h.update(block)
+    return h.hexdigest()
+
+def build_cache_path(output_name):
+    """Hidden sidecar next to the outputs, one per output name (safe for parallel batches)."""
+    directory, base = os.path.split(os.path.abspath(output_name))
+    return os.path.join(directory, f'.{base}.checklist-cache.json')
 
-'''
-        for cmd in data['bg_commands']:
-            md += f'- [ ] `{cmd}`\n'
-        md += '\n'
+def load_build_cache(output_name):
+    try:
+        with open(build_cache_path(output_name), 'r', encoding='utf-8') as f:
+            cache = json.load(f)
+    except (OSError, ValueError):
+        return {}
+    return cache if isinstance(cache, dict) else {}
+
+def file_stamp(path):
+    st = os.stat(path)
+    return [st.st_size, st.st_mtime_ns]
+
+def stale_formats(cache, csv_digest, output_name, formats):
+    """Formats that must be rendered: new CSV or generator, or output missing or touched since."""
+    if cache.get('version') != GENERATOR_VERSION or cache.get('csv_sha256') != csv_digest:
+        return list(formats)
+    outputs = cache.get('outputs', {})
+    stale = []
+    for name in formats:
+        path = f"{output_name}{EMITTERS[name].extension}"
+        try:
+            current = file_stamp(path)
+        except OSError:
+            current = None
+        if current is None or outputs.get(name) != current:
+            stale.append(name)
+    return stale
+
+def save_build_cache(output_name, csv_digest, written, previous):
+    """Record what was just written; entries for other formats survive only if the CSV is the same."""
+    outputs = {}
+    if previous.get('version') == GENERATOR_VERSION and previous.get('csv_sha256') == csv_digest:
+        outputs.update(previous.get('outputs', {}))
+    for cls, path, _ in written:
+        outputs[cls.name] = file_stamp(path)
+    cache = {'version': GENERATOR_VERSION, 'csv_sha256': csv_digest, 'outputs': outputs}
     
-    # Additional tasks section
-    if data.get('tasks'):
-        md += '''## 📝 Additional Tasks
+    path = build_cache_path(output_name)
+    fd, tmp = tempfile.mkstemp(dir=os.path.dirname(path), prefix=os.path.basename(path) + '.', suffix='.tmp')
+    try:
+        with os.fdopen(fd, 'w', encoding='utf-8') as f:
+            json.dump(cache, f)
+        os.replace(tmp, path)
+    except OSError:
+        if os.path.exists(tmp):
+            os.unlink(tmp)  # a missing cache only costs a re-render next time
+
+# ---------- Batch ----------
 
-'''
-        for task in data['tasks']:
-            md += f'- [ ] {task}\n'
-        md += '\n'
+class BatchResult:
+    """Outcome of one config in a batch run."""
     
-    # Notes and status section
-    md += f'''## 📄 Release Notes
+    def __init__(self, csv_file, output_name, outputs=(), items=0, elapsed=0.0, error=None, unchanged=()):
+        self.csv_file = csv_file
+        self.output_name = output_name
+        self.outputs = outputs
+        self.items = items
+        self.elapsed = elapsed
+        self.error = error
+        self.unchanged = unchanged
+    
+    @property
+    def bytes(self):
+        return sum(size for _, _, size in self.outputs)
 
-{data.get('release_notes', 'No additional notes for this release.')}
+def run_job(job):
+    """Process-pool entry point: never raises, so one bad CSV can't stop the batch."""
+    csv_file, output_name, formats, stream, force = job
+    start = time.perf_counter()
+    try:
+        written, items, unchanged = generate_one(csv_file, output_name, formats, stream, force)
+    except Exception as e:
+        return BatchResult(csv_file, output_name, elapsed=time.perf_counter() - start, error=f"{type(e).__name__}: {e}")
+    outputs = [(cls.name, path, size) for cls, path, size in written]
+    return BatchResult(csv_file, output_name, outputs, items, time.perf_counter() - start, unchanged=unchanged)
 
-## 🎯 Deployment Status
+def read_manifest(manifest):
+    """Configs listed one per line as ``config.csv [output_name]``, relative to the manifest.
 
-- [ ] ✅ Deployment Successful
-- [ ] ⚠️ Partial Success (with issues)
-- [ ] ❌ Deployment Failed
-- [ ] 🔄 Rolled Back
+    Blank lines and ``#`` comments are ignored.
+    """
+    base = os.path.dirname(os.path.abspath(manifest))
+    entries = []
+    with open(manifest, 'r', encoding='utf-8') as f:
+        for line in f:
+            line = line.split('#', 1)[0].strip()
+            if not line:
+                continue
+            parts = line.split(None, 1)
+            csv_file = os.path.join(base, parts[0])
+            output_name = os.path.join(base, parts[1].strip()) if len(parts) > 1 else None
+            entries.append((csv_file, output_name, base))
+    return entries
 
-**Final Sign-off**: _________________ **Date**: _________
+def glob_root(pattern):
+    """The leading directories of ``pattern`` that contain no wildcards."""
+    head = pattern
+    while glob.has_magic(head):
+        head = os.path.dirname(head)
+    return head or os.curdir
 
----
+def collect_configs(sources):
+    """Expand directories (``*.csv`` inside), globs and manifests into ``(csv, output_name or None, root)``.
 
-*Generated by [Generic Deployment Checklist Generator](https://github.com/your-repo/deployment-checklist)*
-'''
+    ``root`` is the directory the config was found under; ``--out-dir`` mirrors
+    each CSV's path relative to it.
+    """
+    entries = []
+    for source in sources:
+        if os.path.isdir(source):
+            entries.extend((p, None, source) for p in sorted(glob.glob(os.path.join(source, '*.csv'))))
+        elif os.path.isfile(source) and not source.lower().endswith('.csv'):
+            entries.extend(read_manifest(source))
+        elif glob.has_magic(source):
+            root = glob_root(source)
+            entries.extend((p, None, root) for p in sorted(glob.glob(source, recursive=True)) if os.path.isfile(p))
+        else:
+            entries.append((source, None, os.path.dirname(source)))
     
-    return md
+    seen = set()
+    unique = []
+    for entry in entries:
+        key = os.path.abspath(entry[0])
+        if key not in seen:
+            seen.add(key)
+            unique.append(entry)
+    return unique
 
-def main():
-    """Main function to handle command line arguments and generate checklists."""
+def plan_jobs(entries, out_dir, formats, stream=False, force=False):
+    """Pick an output name per config (mirrored under ``out_dir`` or next to the CSV); reject clashes."""
+    jobs = []
+    owners = {}
+    for csv_file, output_name, root in entries:
+        if output_name is None:
+            output_name = os.path.splitext(csv_file)[0]
+            if out_dir:
+                output_name = os.path.join(out_dir, os.path.relpath(output_name, root or os.curdir))
+        key = os.path.abspath(output_name)
+        if key in owners:
+            raise ValueError(f"{csv_file} and {owners[key]} would both write {output_name}.*")
+        owners[key] = csv_file
+        jobs.append((csv_file, output_name, formats, stream, force))
+    return jobs
+
+def run_batch(jobs, workers):
+    """Render ``jobs`` across a process pool, reporting each as it finishes."""
+    results = []
+    if workers == 1 or len(jobs) == 1:
+        for job in jobs:
+            result = run_job(job)
+            report_result(result)
+            results.append(result)
+        return results
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        futures = [pool.submit(run_job, job) for job in jobs]
+        for future in as_completed(futures):
+            result = future.result()
+            report_result(result)
+            results.append(result)
+    order = {job[0]: i for i, job in enumerate(jobs)}
+    results.sort(key=lambda r: order[r.csv_file])
+    return results
+
+def report_result(result):
+    if result.error:
+        print(f"❌ {result.csv_file}: {result.error}")
+    elif not result.outputs:
+        print(f"⏭️  {result.csv_file}: unchanged")
+    else:
+        names = ', '.join(os.path.basename(path) for _, path, _ in result.outputs)
+        print(f"✅ {result.csv_file} → {names} ({result.elapsed * 1000:.1f} ms)")
+
+def print_batch_summary(results, wall, workers):
+    ok = [r for r in results if not r.error]
+    failed = len(results) - len(ok)
+    unchanged = sum(1 for r in ok if not r.outputs)
     
-    # Parse command line arguments
-    csv_file = sys.argv[1] if len(sys.argv) > 1 else "checklist_config.csv"
-    output_name = sys.argv[2] if len(sys.argv) > 2 else "checklist"
+    print("\n⏱️  Per-file timing")
+    width = max(len(r.csv_file) for r in results)
+    for r in results:
+        if r.error:
+            status = 'failed'
+        elif not r.outputs:
+            status = 'unchanged'
+        else:
+            status = f"{r.items} items, {r.bytes / 1024:.1f} KB"
+        print(f"  {r.csv_file:<{width}}  {r.elapsed * 1000:>9.1f} ms  {status}")
     
-    print("🚀 Generic Deployment Checklist Generator")
-    print("=" * 40)
+    serial = sum(r.elapsed for r in results)
+    total_bytes = sum(r.bytes for r in ok)
+    print("\n📊 Batch summary")
+    print(f"  Configs:    {len(results)} ({len(ok) - unchanged} generated, {unchanged} unchanged, {failed} failed)")
+    print(f"  Items:      {sum(r.items for r in ok)}")
+    print(f"  Output:     {sum(len(r.outputs) for r in ok)} file(s), {total_bytes / 1e6:.2f} MB")
+    print(f"  Wall time:  {wall:.2f}s with {workers} worker(s) (serial estimate {serial:.2f}s)")
+    if wall > 0:
+        print(f"  Throughput: {len(results) / wall:.1f} configs/s, {total_bytes / 1e6 / wall:.2f} MB/s")
+
+def main_batch(args, only=None):
+    """Render every config the batch sources name (just those in ``only`` when given)."""
+    try:
+        entries = collect_configs(args.batch)
+        jobs = plan_jobs(entries, args.out_dir, args.formats, args.stream, args.force)
+    except (OSError, ValueError) as e:
+        print(f"❌ Error: {e}")
+        return 1
+    if only is not None:
+        jobs = [job for job in jobs if os.path.abspath(job[0]) in only]
+    if not jobs:
+        print("❌ Error: no CSV configs found")
+        return 1
+    for output_dir in {os.path.dirname(os.path.abspath(job[1])) for job in jobs}:
+        os.makedirs(output_dir, exist_ok=True)
+    
+    workers = max(1, min(args.jobs or os.cpu_count() or 1, len(jobs)))
+    print(f"Generating {len(jobs)} checklist config(s) with {workers} worker(s)...\n")
+    start = time.perf_counter()
+    results = run_batch(jobs, workers)
+    print_batch_summary(results, time.perf_counter() - start, workers)
+    return 1 if any(r.error for r in results) else 0
+
+# ---------- CLI ----------
+
+def parse_formats(value):
+    formats = [f.strip().lower() for f in value.split(',') if f.strip()]
+    unknown = [f for f in formats if f not in EMITTERS]
+    if unknown or not formats:
+        raise argparse.ArgumentTypeError(f"unknown format(s) {', '.join(unknown) or value!r} (choose from {', '.join(EMITTERS)})")
+    return formats
+
+def build_parser():
+    parser = argparse.ArgumentParser(description='Generate deployment checklists from a CSV configuration.')
+    parser.add_argument('csv_file', nargs='?', default='checklist_config.csv', help='configuration CSV (default: checklist_config.csv)')
+    parser.add_argument('output_name', nargs='?', default='checklist', help='output path without extension (default: checklist)')
+    parser.add_argument('--formats', type=parse_formats, default=DEFAULT_FORMATS,
+                        help=f"comma-separated output formats: {', '.join(EMITTERS)} (default: html,md)")
+    parser.add_argument('--stream', action='store_true',
+                        help='spool list items to temporary files instead of memory, for configs with huge lists')
+    parser.add_argument('--force', action='store_true',
+                        help='render and write every output even if the CSV and generator are unchanged')
+    parser.add_argument('--watch', action='store_true',
+                        help='keep running and regenerate whenever a config CSV changes')
+    parser.add_argument('--interval', type=float, default=1.0, help='--watch polling interval in seconds (default: 1)')
+    parser.add_argument('--batch', nargs='+', metavar='SOURCE',
+                        help='render many configs: directories (every *.csv), globs, or manifest files listing "config.csv [output_name]" per line')
+    parser.add_argument('--out-dir', help='batch mode: write outputs here instead of next to each CSV')
+    parser.add_argument('-j', '--jobs', type=int, default=None, help='batch mode: worker processes (default: CPU count)')
+    return parser
+
+def main_single(args):
+    """Generate the checklists for one config, skipping formats that are up to date."""
+    csv_file = args.csv_file
+    output_name = args.output_name
     
     if not os.path.exists(csv_file):
         print(f"❌ Error: {csv_file} not found!")
         return 1
     
-    # Read CSV data
-    data = {}
     try:
-        with open(csv_file, 'r', encoding='utf-8') as f:
-            reader = csv.DictReader(f)
-            for row in reader:
-                type_val = row['type'].strip()
-                values = row['values'].strip()
-                
-                if type_val in ['features', 'services', 'health_checks', 'commands', 'bg_commands', 'tasks', 'pre_deployment', 'post_deployment', 'production_prs']:
-                    data[type_val] = [v.strip() for v in values.split(',') if v.strip()]
-                else:
-                    data[type_val] = values
+        written, _, unchanged = generate_one(csv_file, output_name, args.formats, args.stream, args.force)
     except Exception as e:
-        print(f"❌ Error reading CSV file: {e}")
+        print(f"❌ Error generating checklists from {csv_file}: {e}")
         return 1
     
-    project_name = data.get('project_name', 'Deployment Project')
+    for cls, path, _ in written:
+        print(f"✅ Generated {cls.label}: {path}")
+    for name in args.formats:
+        path = f"{output_name}{EMITTERS[name].extension}"
+        if path in unchanged:
+            print(f"⏭️  Unchanged {EMITTERS[name].label}: {path}")
     
-    # Generate HTML
-    html_content = generate_html(data, project_name)
-    html_file = f"{output_name}.html"
+    print(f"📄 Configuration: {csv_file}")
+    if 'html' in args.formats:
+        print(f"🌐 Interactive: Open {output_name}.html in browser")
+    if 'md' in args.formats:
+        print(f"📝 Git-friendly: Use {output_name}.md in repositories")
     
+    return 0
+
+# ---------- Watch ----------
+
+def watched_files(args):
+    if args.batch:
+        try:
+            return [entry[0] for entry in collect_configs(args.batch)]
+        except OSError:
+            return []
+    return [args.csv_file]
+
+def snapshot(paths):
+    """``{absolute path: (mtime_ns, size)}``; a stat per file, no reads."""
+    state = {}
+    for path in paths:
+        try:
+            st = os.stat(path)
+        except OSError:
+            continue
+        state[os.path.abspath(path)] = (st.st_mtime_ns, st.st_size)
+    return state
+
+def watch(args):
+    """Poll the configs and regenerate the ones whose CSV changed, until interrupted.
+
+    Polling only stats each file, so it is cheap for hundreds of configs; a
+    touched but unchanged CSV is caught by the build cache and rewrites nothing.
+    """
+    print(f"\n👀 Watching for changes every {args.interval:g}s (Ctrl+C to stop)")
+    state = snapshot(watched_files(args))
     try:
-        with open(html_file, 'w', encoding='utf-8') as f:
-            f.write(html_content)
-        print(f"✅ Generated HTML: {html_file}")
-    except Exception as e:
-        print(f"❌ Error writing HTML file: {e}")
-        return 1
-    
-    # Generate Markdown
-    md_content = generate_markdown(data, project_name)
-    md_file = f"{output_name}.md"
+        while True:
+            time.sleep(args.interval)
+            current = snapshot(watched_files(args))
+            changed = sorted(path for path, stamp in current.items() if state.get(path) != stamp)
+            state = current
+            if not changed:
+                continue
+            print(f"\n🔄 Changed: {', '.join(os.path.relpath(path) for path in changed)}")
+            if args.batch:
+                main_batch(args, only=set(changed))
+            else:
+                main_single(args)
+    except KeyboardInterrupt:
+        print("\nStopped watching")
+        return 0
+
+def main():
+    """Main function to handle command line arguments and generate checklists."""
     
-    try:
-        with open(md_file, 'w', encoding='utf-8') as f:
-            f.write(md_content)
-        print(f"✅ Generated Markdown: {md_file}")
-    except Exception as e:
-        print(f"❌ Error writing Markdown file: {e}")
-        return 1
+    # Parse command line arguments
+    args = build_parser().parse_args()
     
-    print(f"📄 Configuration: {csv_file}")
-    print(f"🌐 Interactive: Open {html_file} in browser")
-    print(f"📝 Git-friendly: Use {md_file} in repositories")
+    print("🚀 Generic Deployment Checklist Generator")
+    print("=" * 40)
     
-    return 0
+    status = main_batch(args) if args.batch else main_single(args)
+    if args.watch:
+        return watch(args)
+    return status
 
 if __name__ == "__main__":
     exit(main())
@@ -0,0 +1,266 @@
+#!/usr/bin/env python3
+"""Pluggable model backends behind ``compress.call_claude``.
+
+- ``api``  — Anthropic API through the shared rate-limited engine (needs ANTHROPIC_API_KEY)
+- ``cli``  — the ``claude --print`` CLI, which handles desktop auth
+- ``mock`` — a local, deterministic rule-based compressor for offline load tests
+- ``auto`` — ``api`` when a key and the SDK are available, else ``cli`` (default)
+
+Select with ``$CAVEMAN_BACKEND`` or ``caveman --backend``. Every backend feeds
+its output through the caller's ``StreamGuard`` and returns ``guard.finish()``.
+"""
+
+import os
+import random
+import re
+import subprocess
+import threading
+import time
+from typing import Dict, Optional
+
+from . import telemetry
+from .client import backoff_delay, estimate_tokens, get_engine
+from .stream import StreamAborted, StreamGuard
+
+DEFAULT_MODEL = "claude-sonnet-4-5"
+
+BACKEND_NAMES = ("auto", "api", "cli", "mock")
+
+
+def get_model() -> str:
+    return os.environ.get("CAVEMAN_MODEL", DEFAULT_MODEL)
+
+
+def _env_float(name: str, default: float) -> float:
+    try:
+        return float(os.environ.get(name, default))
+    except ValueError:
+        return default
+
+
+class Backend:
+    """Turns a prompt into response text, streamed through a ``StreamGuard``."""
+
+    name = "base"
+
+    @property
+    def model(self) -> str:
+        """Model identity, part of the result-cache key."""
+        return get_model()
+
+    def complete(self, prompt: str, guard: StreamGuard) -> str:
+        raise NotImplementedError
+
+
+class AnthropicBackend(Backend):
+    name = "api"
+
+    def __init__(self, api_key: str):
+        self.engine = get_engine(api_key)  # ImportError when the SDK is missing
+
+    def complete(self, prompt: str, guard: StreamGuard) -> str:
+        run = telemetry.current()
+        future = self.engine.submit(get_model(), prompt, guard, on_retry=run.add_retry if run else None)
+        text, usage = future.result()
+        telemetry.record_call(getattr(usage, "input_tokens", None), getattr(usage, "output_tokens", None))
+        return text
+
+
+class ClaudeCLIBackend(Backend):
+    name = "cli"
+
+    def complete(self, prompt: str, guard: StreamGuard) -> str:
+        """Stream ``claude --print`` output through ``guard``, killing it on abort."""
+        proc = subprocess.Popen(
+            ["claude", "--print"],
+            stdin=subprocess.PIPE,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.PIPE,
+            text=True,
+        )
+        stderr = []
+
+        def feed_stdin():
+            try:
+                proc.stdin.write(prompt)
+                proc.stdin.close()
+            except OSError:
+                pass  # process exited early; its exit code tells the story
+
+        pumps = [
+            threading.Thread(target=feed_stdin, daemon=True),
+            threading.Thread(target=lambda: stderr.append(proc.stderr.read()), daemon=True),
+        ]
+        for t in pumps:
+            t.start()
+        try:
+            for line in proc.stdout:
+                guard.feed(line)
+        except StreamAborted:
+            proc.kill()
+            proc.wait()
+            guard.close()
+            raise
+        proc.wait()
+        for t in pumps:
+            t.join()
+        if proc.returncode != 0:
+            guard.close()
+            raise RuntimeError("Claude call failed:\n" + "".join(stderr))
+        telemetry.record_call()  # the CLI reports no usage
+        return guard.finish()
+
+
+# ---------- Mock Backend ----------
+
+# Words the mock drops from prose, loosely following the caveman rules.
+MOCK_FILLER_REGEX = re.compile(
+    r"\b(?:a|an|the|just|really|basically|actually|simply|essentially|very|quite|"
+    r"please|generally|however|furthermore|additionally)\b,? ?",
+    re.IGNORECASE,
+)
+# Spans the mock must never touch: placeholders, inline code, URLs, paths, file names.
+MOCK_PROTECTED_REGEX = re.compile(r"⟦[BCU]\d+⟧|`[^`\n]+`|https?://[^\s)]+|\S*/\S*|\w+\.\w\S*")
+MOCK_PROTECTED_LINE_REGEX = re.compile(r"^\s*(#{1,6}\s|```|~~~|\|)")
+
+# What an injected corruption drops: a masked span or a URL, both caught by validation.
+MOCK_CORRUPT_REGEX = re.compile(r"⟦[BCU]\d+⟧|https?://[^\s)]+")
+MOCK_BACKOFF_SCALE = 0.01  # client.backoff_delay, shrunk so load tests stay fast
+
+PROMPT_TEXT_MARKER = "\nTEXT:\n"
+FIX_ORIGINAL_MARKER = "ORIGINAL (reference only):\n"
+FIX_COMPRESSED_MARKER = "\n\nCOMPRESSED (fix this):\n"
+
+
+class MockTransientError(RuntimeError):
+    """Injected failure standing in for a 429/529 response."""
+
+
+def mock_compress(text: str) -> str:
+    """Drop filler words from prose lines, leaving headings, fences, tables and protected spans alone."""
+    out = []
+    in_fence = False
+    for line in text.split("\n"):
+        if line.lstrip().startswith(("```", "~~~")):
+            in_fence = not in_fence
+            out.append(line)
+            continue
+        if in_fence or MOCK_PROTECTED_LINE_REGEX.match(line):
+            out.append(line)
+            continue
+        pieces = []
+        last = 0
+        for m in MOCK_PROTECTED_REGEX.finditer(line):
+            pieces.append(MOCK_FILLER_REGEX.sub("", line[last:m.start()]))
+            pieces.append(m.group(0))
+            last = m.end()
+        pieces.append(MOCK_FILLER_REGEX.sub("", line[last:]))
+        out.append("".join(pieces))
+    return "\n".join(out)
+
+
+class MockBackend(Backend):
+    """Deterministic offline stand-in for the model.
+
+    Compress prompts get ``mock_compress`` applied to their TEXT; fix prompts
+    get it applied to the ORIGINAL, which always validates. Behaviour is tuned
+    through environment variables:
+
+    - ``CAVEMAN_MOCK_LATENCY``      seconds per call (default 0)
+    - ``CAVEMAN_MOCK_ERROR_RATE``   chance a call hits an injected transient error (retried with backoff)
+    - ``CAVEMAN_MOCK_CORRUPT_RATE`` chance a compression drops a protected span, forcing the fix path
+    - ``CAVEMAN_MOCK_SEED``         RNG seed (default 0)
+    """
+
+    name = "mock"
+    model = "mock"  # never share cache entries with real model output
+
+    def __init__(self):
+        self.latency = _env_float("CAVEMAN_MOCK_LATENCY", 0.0)
+        self.error_rate = _env_float("CAVEMAN_MOCK_ERROR_RATE", 0.0)
+        self.corrupt_rate = _env_float("CAVEMAN_MOCK_CORRUPT_RATE", 0.0)
+        self.max_retries = int(_env_float("CAVEMAN_MAX_RETRIES", 5))
+        self._rng = random.Random(os.environ.get("CAVEMAN_MOCK_SEED", "0"))
+        self._lock = threading.Lock()
+        self.calls = 0
+        self.retries = 0
+
+    def _roll(self) -> float:
+        with self._lock:
+            return self._rng.random()
+
+    def _respond(self, prompt: str) -> str:
+        if FIX_ORIGINAL_MARKER in prompt and FIX_COMPRESSED_MARKER in prompt:
+            original = prompt.split(FIX_ORIGINAL_MARKER, 1)[1].split(FIX_COMPRESSED_MARKER, 1)[0]
+            return mock_compress(original.strip())
+        text = prompt.split(PROMPT_TEXT_MARKER, 1)[-1].strip()
+        out = mock_compress(text)
+        if self.corrupt_rate and self._roll() < self.corrupt_rate:
+            out = MOCK_CORRUPT_REGEX.sub("", out, count=1)
+        return out
+
+    def complete(self, prompt: str, guard: StreamGuard) -> str:
+        with self._lock:
+            self.calls += 1
+        for attempt in range(self.max_retries + 1):
+            if self.latency:
+                time.sleep(self.latency)
+            if self.error_rate and self._roll() < self.error_rate:
+                if attempt == self.max_retries:
+                    raise MockTransientError("mock backend: injected failure after retries")
+                with self._lock:
+                    self.retries += 1
+                telemetry.record_retry()
+                time.sleep(backoff_delay(attempt) * MOCK_BACKOFF_SCALE)
+                continue
+            break
+        out = self._respond(prompt)
+        telemetry.record_call(estimate_tokens(prompt), estimate_tokens(out))
+        for i in range(0, len(out), 64):
+            guard.feed(out[i:i + 64])
+        return guard.finish()
+
+
+# ---------- Selection ----------
+
+_backends: Dict[str, Backend] = {}
+_backends_lock = threading.Lock()
+_selected: Optional[str] = None
+
+
+def set_backend(name: Optional[str]):
+    """Override ``$CAVEMAN_BACKEND`` for this process (e.g. from ``--backend``)."""
+    global _selected
+    if name is not None and name not in BACKEND_NAMES:
+        raise ValueError(f"Unknown backend {name!r} (choose from {', '.join(BACKEND_NAMES)})")
+    _selected = name
+
+
+def _resolve(name: str) -> Backend:
+    if name == "mock":
+        return MockBackend()
+    if name == "cli":
+        return ClaudeCLIBackend()
+    api_key = os.environ.get("ANTHROPIC_API_KEY")
+    if name == "api":
+        if not api_key:
+            raise ValueError("CAVEMAN_BACKEND=api needs ANTHROPIC_API_KEY")
+        return AnthropicBackend(api_key)
+    # auto
+    if api_key:
+        try:
+            return AnthropicBackend(api_key)
+        except ImportError:
+            pass  # anthropic not installed, fall back to CLI
+    return ClaudeCLIBackend()
+
+
+def get_backend() -> Backend:
+    """Return the process-wide backend for the selected name, creating it once."""
+    name = _selected or os.environ.get("CAVEMAN_BACKEND", "auto").strip().lower() or "auto"
+    if name not in BACKEND_NAMES:
+        raise ValueError(f"Unknown CAVEMAN_BACKEND {name!r} (choose from {', '.join(BACKEND_NAMES)})")
+    with _backends_lock:
+        if name not in _backends:
+            _backends[name] = _resolve(name)
+        return _backends[name]
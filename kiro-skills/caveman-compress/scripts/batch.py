@@ -0,0 +1,156 @@
+#!/usr/bin/env python3
+"""Compress many files concurrently with a bounded worker pool.
+
+Each file is still handled by ``compress_file`` on its own — the pool only
+overlaps the API round-trips, which dominate wall time. Concurrency is capped
+so a large tree cannot fan out into hundreds of simultaneous requests.
+"""
+
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from pathlib import Path
+from typing import Callable, Iterable, List, Optional
+
+from .compress import compress_file, is_sensitive_path
+from .detect import ClassificationIndex, detect_many
+
+DEFAULT_JOBS = 4
+
+# Directories never worth descending into when walking a tree. Other dot
+# directories are walked: Kiro steering and skill files live under .kiro/.
+SKIP_DIRS = frozenset({
+    ".git", ".hg", ".svn", "node_modules", "__pycache__",
+    ".venv", "venv", ".tox", ".nox", ".mypy_cache", ".pytest_cache", ".ruff_cache",
+})
+
+
+class FileResult:
+    """Outcome of compressing a single file in a batch."""
+
+    def __init__(self, path: Path, status: str, elapsed: float, error: Optional[str] = None):
+        self.path = path
+        self.status = status  # 'compressed', 'skipped', 'failed' or 'error'
+        self.elapsed = elapsed
+        self.error = error
+
+    @property
+    def ok(self) -> bool:
+        return self.status == "compressed"
+
+
+def default_jobs() -> int:
+    """Worker count from CAVEMAN_JOBS, falling back to DEFAULT_JOBS."""
+    try:
+        return max(1, int(os.environ.get("CAVEMAN_JOBS", DEFAULT_JOBS)))
+    except ValueError:
+        return DEFAULT_JOBS
+
+
+def _is_candidate(path: Path) -> bool:
+    """Cheap checks for a walked file; content detection happens in bulk afterwards."""
+    return not path.name.endswith(".original.md") and not is_sensitive_path(path) and path.is_file()
+
+
+def compressed_sibling(path: Path) -> Path:
+    """``X.md`` for a ``X.original.md`` backup; any other path unchanged."""
+    if path.name.endswith(".original.md"):
+        return path.with_name(path.name.removesuffix(".original.md") + ".md")
+    return path
+
+
+def collect_targets(
+    paths: Iterable[Path], recursive: bool = False, use_index: bool = True, incremental: bool = False
+) -> List[Path]:
+    """Expand CLI paths into the list of files to compress.
+
+    Files named explicitly are kept as-is so ``compress_file`` can report why it
+    refuses them; with ``incremental`` an edited ``X.original.md`` backup
+    stands for its compressed ``X.md``, as in single-file mode. Files found by walking a directory are filtered silently with
+    ``is_sensitive_path`` and a bulk ``detect_many`` pass, as ``should_compress`` would.
+    With ``use_index`` unchanged files are classified from the persistent
+    ``ClassificationIndex`` instead of being re-read.
+    """
+    targets = []
+    seen = set()
+    index = ClassificationIndex() if use_index and recursive else None
+
+    def add(p: Path, resolved: bool = False):
+        if not resolved:
+            p = p.resolve()
+        if p not in seen:
+            seen.add(p)
+            targets.append(p)
+
+    for path in paths:
+        if path.is_file():
+            add(compressed_sibling(path) if incremental else path)
+            continue
+        if not path.is_dir() or not recursive:
+            continue
+        walked = []
+        # Walking a resolved root yields real directories, so only the root needs resolving.
+        top = path.resolve()
+        if index is not None:
+            index.walked(top)
+        for root, dirs, files in os.walk(top):
+            dirs[:] = sorted(d for d in dirs if d not in SKIP_DIRS)
+            for name in sorted(files):
+                candidate = Path(root) / name
+                if _is_candidate(candidate):
+                    walked.append(candidate)
+        for candidate, file_type in zip(walked, detect_many(walked, index=index)):
+            if file_type == "natural_language":
+                add(candidate, resolved=True)
+    if index is not None:
+        index.save()
+    return targets
+
+
+def _compress_one(path: Path, **kwargs) -> FileResult:
+    start = time.perf_counter()
+    try:
+        ok = compress_file(path, **kwargs)
+        status = "compressed" if ok else "skipped" if ok is None else "failed"
+        return FileResult(path, status, time.perf_counter() - start)
+    except Exception as e:
+        return FileResult(path, "error", time.perf_counter() - start, str(e))
+
+
+def compress_many(
+    paths: List[Path],
+    jobs: Optional[int] = None,
+    on_result: Optional[Callable[[FileResult], None]] = None,
+    **kwargs,
+) -> List[FileResult]:
+    """Run ``compress_file`` over ``paths`` with at most ``jobs`` in flight.
+
+    ``on_result`` is called from the calling thread as each file finishes, so
+    progress can be reported without waiting for the whole batch. Extra keyword
+    arguments are forwarded to ``compress_file``. Results come back in input order.
+    """
+    jobs = jobs or default_jobs()
+    results = {}
+    with ThreadPoolExecutor(max_workers=jobs, thread_name_prefix="caveman") as pool:
+        futures = {pool.submit(_compress_one, p, **kwargs): p for p in paths}
+        for future in as_completed(futures):
+            res = future.result()
+            results[futures[future]] = res
+            if on_result is not None:
+                on_result(res)
+    return [results[p] for p in paths]
+
+
+def print_summary(results: List[FileResult], wall: float):
+    compressed = sum(1 for r in results if r.status == "compressed")
+    skipped = sum(1 for r in results if r.status == "skipped")
+    failed = sum(1 for r in results if r.status == "failed")
+    errored = sum(1 for r in results if r.status == "error")
+    busy = sum(r.elapsed for r in results)
+    print("\nBatch summary")
+    print(f"  Files:      {len(results)}")
+    print(f"  Compressed: {compressed}")
+    print(f"  Skipped:    {skipped}")
+    print(f"  Failed:     {failed}")
+    print(f"  Errors:     {errored}")
+    print(f"  Wall time:  {wall:.1f}s (serial estimate {busy:.1f}s)")
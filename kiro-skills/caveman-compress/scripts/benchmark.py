@@ -1,20 +1,48 @@
 #!/usr/bin/env python3
+"""Score original/compressed markdown pairs: token savings and validation.
+
+Usage:
+    python3 scripts/benchmark.py [original.md compressed.md]
+    python3 scripts/benchmark.py --dir corpus/ [--jobs N] [--format table|json|csv] [--no-cache]
+
+Without a pair, every ``X.original.md`` / ``X.md`` pair in ``--dir`` (default:
+the repo's tests/caveman-compress) is scored. Pairs are sharded across a
+process pool and rows are written as shards complete, followed by aggregate
+stats.
+"""
+
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from functools import lru_cache
 from pathlib import Path
+import argparse
+import csv
+import json
+import os
 import sys
+import time
 
 # Support both direct execution and module import
 try:
-    from .validate import validate
+    from .cache import BenchmarkCache, text_hash
+    from .validate import validate_text
 except ImportError:
     sys.path.insert(0, str(Path(__file__).parent))
-    from validate import validate
+    from cache import BenchmarkCache, text_hash
+    from validate import validate_text
+
+ENCODING_NAME = "o200k_base"
 
 try:
     import tiktoken
-    _enc = tiktoken.get_encoding("o200k_base")
+    _enc = tiktoken.get_encoding(ENCODING_NAME)
 except ImportError:
     _enc = None
 
+# Names the counting scheme in cache keys, so word counts never pass for tokens.
+TOKENIZER = ENCODING_NAME if _enc is not None else "words"
+
+ENCODE_THREADS = min(32, os.cpu_count() or 8)
+
 
 def count_tokens(text):
     if _enc is None:
@@ -22,58 +50,290 @@ def count_tokens(text):
     return len(_enc.encode(text))
 
 
-def benchmark_pair(orig_path: Path, comp_path: Path):
-    orig_text = orig_path.read_text()
-    comp_text = comp_path.read_text()
+def count_tokens_many(texts):
+    """Token counts for ``texts``, encoded in one multi-threaded batch."""
+    if _enc is None or len(texts) < 2:
+        return [count_tokens(t) for t in texts]
+    return [len(ids) for ids in _enc.encode_batch(texts, num_threads=ENCODE_THREADS)]
+
+
+@lru_cache(maxsize=1)
+def _validator_fingerprint():
+    """Hash of validate.py, so cached verdicts expire when the rules change."""
+    source = Path(sys.modules[validate_text.__module__].__file__)
+    return text_hash(source.read_text(encoding="utf-8"))[:16]
+
+
+def benchmark_pairs(pairs, cache=None):
+    """Score ``(orig_path, comp_path)`` pairs; rows come back in input order.
+
+    Token counts and validation verdicts are looked up in ``cache`` by content
+    hash, and only texts it has never seen are tokenized (in one batch) or
+    validated. The caller saves the cache.
+    """
+    texts = [(o.read_text(), c.read_text()) for o, c in pairs]
+    hashes = [(text_hash(ot), text_hash(ct)) for ot, ct in texts]
+
+    counts = {}
+    todo = {}
+    for (ot, ct), (oh, ch) in zip(texts, hashes):
+        for digest, text in ((oh, ot), (ch, ct)):
+            cached = cache.get_tokens(TOKENIZER, digest) if cache else None
+            if cached is not None:
+                counts[digest] = cached
+            elif digest not in counts:
+                todo[digest] = text
+    for digest, n in zip(todo, count_tokens_many(list(todo.values()))):
+        counts[digest] = n
+        if cache:
+            cache.put_tokens(TOKENIZER, digest, n)
+
+    fingerprint = _validator_fingerprint() if cache else ""
+    rows = []
+    for (_, comp_path), (ot, ct), (oh, ch) in zip(pairs, texts, hashes):
+        orig_tokens = counts[oh]
+        comp_tokens = counts[ch]
+        saved = 100 * (orig_tokens - comp_tokens) / orig_tokens if orig_tokens > 0 else 0.0
+
+        key = f"{fingerprint}:{oh}:{ch}"
+        valid = cache.get_verdict(key) if cache else None
+        if valid is None:
+            valid = validate_text(ot, ct).is_valid
+            if cache:
+                cache.put_verdict(key, valid)
+
+        rows.append((comp_path.name, orig_tokens, comp_tokens, saved, valid))
+    return rows
+
+
+def benchmark_pair(orig_path: Path, comp_path: Path, cache=None):
+    return benchmark_pairs([(orig_path, comp_path)], cache)[0]
+
+
+# ---------- Parallel Runner ----------
+
+SHARD_SIZE = 16  # pairs per task: small enough to stream, large enough to batch-encode
+
+_worker_cache = None
+
+
+def _init_worker(use_cache: bool):
+    global _worker_cache
+    _worker_cache = BenchmarkCache() if use_cache else None
+
+
+def _score_shard(pairs):
+    """Worker entry point: rows for ``pairs`` plus cache entries it had to compute."""
+    rows = benchmark_pairs(pairs, _worker_cache)
+    fresh = _worker_cache.take_fresh() if _worker_cache else ({}, {})
+    return rows, fresh
+
+
+def iter_rows(pairs, jobs: int, cache=None):
+    """Yield scored rows as shards complete, sharding across ``jobs`` processes.
+
+    Each worker loads its own read-only view of the cache; entries it computes
+    are merged back into ``cache`` here, so the caller saves once at the end.
+    """
+    shards = [pairs[i:i + SHARD_SIZE] for i in range(0, len(pairs), SHARD_SIZE)]
+    if jobs <= 1 or len(shards) <= 1:
+        for shard in shards:
+            yield from benchmark_pairs(shard, cache)
+        return
+
+    if cache:
+        cache.save()  # workers start from what the parent already knows
+    with ProcessPoolExecutor(
+        max_workers=min(jobs, len(shards)), initializer=_init_worker, initargs=(cache is not None,)
+    ) as pool:
+        futures = [pool.submit(_score_shard, shard) for shard in shards]
+        for future in as_completed(futures):
+            rows, (tokens, verdicts) = future.result()
+            if cache:
+                cache.merge(tokens, verdicts)
+            yield from rows
+
+
+class Summary:
+    """Running totals over scored rows."""
+
+    def __init__(self):
+        self.pairs = 0
+        self.original = 0
+        self.compressed = 0
+        self.saved_pct_sum = 0.0
+        self.failures = 0
+
+    def add(self, row):
+        _, orig_tokens, comp_tokens, saved, valid = row
+        self.pairs += 1
+        self.original += orig_tokens
+        self.compressed += comp_tokens
+        self.saved_pct_sum += saved
+        self.failures += not valid
+
+    def as_dict(self, elapsed: float) -> dict:
+        pairs = self.pairs or 1
+        return {
+            "pairs": self.pairs,
+            "original_tokens": self.original,
+            "compressed_tokens": self.compressed,
+            "tokens_saved": self.original - self.compressed,
+            "weighted_saved_pct": round(100 * (self.original - self.compressed) / self.original, 2) if self.original else 0.0,
+            "mean_saved_pct": round(self.saved_pct_sum / pairs, 2),
+            "validation_failures": self.failures,
+            "failure_rate_pct": round(100 * self.failures / pairs, 2),
+            "elapsed_s": round(elapsed, 3),
+        }
+
 
-    orig_tokens = count_tokens(orig_text)
-    comp_tokens = count_tokens(comp_text)
-    saved = 100 * (orig_tokens - comp_tokens) / orig_tokens if orig_tokens > 0 else 0.0
-    result = validate(orig_path, comp_path)
+# ---------- Output ----------
 
-    return (comp_path.name, orig_tokens, comp_tokens, saved, result.is_valid)
+
+def _row_dict(r) -> dict:
+    return {"file": r[0], "original": r[1], "compressed": r[2], "saved_pct": round(r[3], 2), "valid": r[4]}
+
+
+class TableWriter:
+    def __init__(self, out):
+        self.out = out
+
+    def start(self):
+        print("\n| File | Original | Compressed | Saved % | Valid |", file=self.out)
+        print("|------|----------|------------|---------|-------|", file=self.out)
+
+    def row(self, r):
+        print(f"| {r[0]} | {r[1]} | {r[2]} | {r[3]:.1f}% | {'✅' if r[4] else '❌'} |", file=self.out, flush=True)
+
+    def finish(self, summary: dict):
+        if summary["pairs"] < 2:
+            return
+        print(
+            f"\nPairs: {summary['pairs']}  "
+            f"Tokens: {summary['original_tokens']} → {summary['compressed_tokens']} "
+            f"(saved {summary['tokens_saved']}, weighted {summary['weighted_saved_pct']:.1f}%, "
+            f"mean {summary['mean_saved_pct']:.1f}%)  "
+            f"Validation failures: {summary['validation_failures']} ({summary['failure_rate_pct']:.1f}%)  "
+            f"Time: {summary['elapsed_s']:.2f}s",
+            file=self.out,
+        )
+
+
+class JsonWriter:
+    """Streams ``{"rows": [...], "summary": {...}}`` one row at a time."""
+
+    def __init__(self, out):
+        self.out = out
+        self.first = True
+
+    def start(self):
+        self.out.write('{"rows": [')
+
+    def row(self, r):
+        self.out.write(("\n  " if self.first else ",\n  ") + json.dumps(_row_dict(r), ensure_ascii=False))
+        self.out.flush()
+        self.first = False
+
+    def finish(self, summary: dict):
+        self.out.write('\n], "summary": ' + json.dumps(summary) + "}\n")
+
+
+class CsvWriter:
+    """Rows on the output; the summary goes to stderr to keep the CSV rectangular."""
+
+    def __init__(self, out):
+        self.out = out
+        self.writer = csv.writer(out)
+
+    def start(self):
+        self.writer.writerow(["file", "original", "compressed", "saved_pct", "valid"])
+
+    def row(self, r):
+        d = _row_dict(r)
+        self.writer.writerow([d["file"], d["original"], d["compressed"], d["saved_pct"], d["valid"]])
+        self.out.flush()
+
+    def finish(self, summary: dict):
+        print(json.dumps(summary), file=sys.stderr)
+
+
+WRITERS = {"table": TableWriter, "json": JsonWriter, "csv": CsvWriter}
 
 
 def print_table(rows):
-    print("\n| File | Original | Compressed | Saved % | Valid |")
-    print("|------|----------|------------|---------|-------|")
+    writer = TableWriter(sys.stdout)
+    writer.start()
     for r in rows:
-        print(f"| {r[0]} | {r[1]} | {r[2]} | {r[3]:.1f}% | {'✅' if r[4] else '❌'} |")
+        writer.row(r)
+
+
+def run(pairs, jobs: int, fmt: str = "table", cache=None, out=None) -> dict:
+    """Score ``pairs``, streaming rows to ``out`` in ``fmt``; return the summary."""
+    writer = WRITERS[fmt](out or sys.stdout)
+    summary = Summary()
+    start = time.perf_counter()
+    writer.start()
+    for r in iter_rows(pairs, jobs, cache):
+        summary.add(r)
+        writer.row(r)
+    result = summary.as_dict(time.perf_counter() - start)
+    writer.finish(result)
+    if cache:
+        cache.save()
+    return result
+
+
+def find_pairs(directory: Path):
+    pairs = []
+    for orig in sorted(directory.glob("*.original.md")):
+        comp = orig.with_name(orig.stem.removesuffix(".original") + ".md")
+        if comp.exists():
+            pairs.append((orig, comp))
+    return pairs
 
 
 def main():
+    # Glob mode default: repo_root/tests/caveman-compress/
+    # __file__ lives at <repo_root>/skills/caveman-compress/scripts/benchmark.py
+    # Walk up four dirs: scripts → caveman-compress → skills → repo_root.
+    default_dir = Path(__file__).resolve().parents[3] / "tests" / "caveman-compress"
+
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("pair", nargs="*", type=Path, help="original.md compressed.md")
+    parser.add_argument("--dir", type=Path, default=default_dir, help="directory of X.original.md / X.md pairs")
+    parser.add_argument("-j", "--jobs", type=int, default=os.cpu_count() or 1, help="worker processes (default: CPU count)")
+    parser.add_argument("--format", choices=sorted(WRITERS), default="table")
+    parser.add_argument("--no-cache", dest="use_cache", action="store_false",
+                        help="neither read nor update the token-count/verdict cache")
+    args = parser.parse_args()
+    cache = BenchmarkCache() if args.use_cache else None
+
     # Direct file pair: python3 benchmark.py original.md compressed.md
-    if len(sys.argv) == 3:
-        orig = Path(sys.argv[1]).resolve()
-        comp = Path(sys.argv[2]).resolve()
+    if args.pair:
+        if len(args.pair) != 2:
+            parser.error("expected exactly two files: original.md compressed.md")
+        orig = args.pair[0].resolve()
+        comp = args.pair[1].resolve()
         if not orig.exists():
             print(f"❌ Not found: {orig}")
             sys.exit(1)
         if not comp.exists():
             print(f"❌ Not found: {comp}")
             sys.exit(1)
-        print_table([benchmark_pair(orig, comp)])
+        run([(orig, comp)], 1, args.format, cache)
         return
 
-    # Glob mode: repo_root/tests/caveman-compress/
-    # __file__ lives at <repo_root>/skills/caveman-compress/scripts/benchmark.py
-    # Walk up four dirs: scripts → caveman-compress → skills → repo_root.
-    tests_dir = Path(__file__).resolve().parents[3] / "tests" / "caveman-compress"
+    tests_dir = args.dir.resolve()
     if not tests_dir.exists():
         print(f"❌ Tests dir not found: {tests_dir}")
         sys.exit(1)
 
-    rows = []
-    for orig in sorted(tests_dir.glob("*.original.md")):
-        comp = orig.with_name(orig.stem.removesuffix(".original") + ".md")
-        if comp.exists():
-            rows.append(benchmark_pair(orig, comp))
-
-    if not rows:
+    pairs = find_pairs(tests_dir)
+    if not pairs:
         print("No compressed file pairs found.")
         return
 
-    print_table(rows)
+    run(pairs, args.jobs, args.format, cache)
 
 
 if __name__ == "__main__":
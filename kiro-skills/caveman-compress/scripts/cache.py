@@ -0,0 +1,231 @@
+#!/usr/bin/env python3
+"""Content-addressed on-disk cache of validated compression results.
+
+Entries are keyed by SHA-256 of the original text, the model name and the
+prompt version, so any change to input, model or prompt misses naturally.
+Only output that passed validation is stored. The cache is bounded by total
+size; the least recently used entries (by mtime, refreshed on every hit) are
+evicted first.
+"""
+
+import hashlib
+import json
+import os
+import tempfile
+from pathlib import Path
+from typing import Dict, List, Optional
+
+DEFAULT_MAX_BYTES = 64 * 1024 * 1024  # 64MB
+
+MANIFEST_VERSION = 1
+
+
+def cache_dir() -> Path:
+    """Root cache directory: $CAVEMAN_CACHE_DIR, else $XDG_CACHE_HOME/caveman, else ~/.cache/caveman."""
+    override = os.environ.get("CAVEMAN_CACHE_DIR")
+    if override:
+        return Path(override).expanduser()
+    xdg = os.environ.get("XDG_CACHE_HOME")
+    base = Path(xdg).expanduser() if xdg else Path.home() / ".cache"
+    return base / "caveman"
+
+
+def cache_key(text: str, model: str, prompt_version: str) -> str:
+    h = hashlib.sha256()
+    for part in (prompt_version, model, text):
+        h.update(part.encode("utf-8", errors="surrogatepass"))
+        h.update(b"\0")
+    return h.hexdigest()
+
+
+class ResultCache:
+    """Size-bounded LRU cache of compressed markdown keyed by ``cache_key``."""
+
+    def __init__(self, root: Optional[Path] = None, max_bytes: Optional[int] = None):
+        self.root = (root or cache_dir()) / "results"
+        if max_bytes is None:
+            try:
+                max_bytes = int(os.environ.get("CAVEMAN_CACHE_MAX_BYTES", DEFAULT_MAX_BYTES))
+            except ValueError:
+                max_bytes = DEFAULT_MAX_BYTES
+        self.max_bytes = max_bytes
+
+    def _path(self, key: str) -> Path:
+        return self.root / key[:2] / f"{key}.md"
+
+    def get(self, key: str) -> Optional[str]:
+        path = self._path(key)
+        try:
+            text = path.read_text(encoding="utf-8")
+        except (OSError, UnicodeDecodeError):
+            return None
+        try:
+            os.utime(path)  # mark as recently used
+        except OSError:
+            pass
+        return text
+
+    def put(self, key: str, text: str):
+        path = self._path(key)
+        try:
+            path.parent.mkdir(parents=True, exist_ok=True)
+            fd, tmp = tempfile.mkstemp(dir=path.parent, suffix=".tmp")
+            with os.fdopen(fd, "w", encoding="utf-8") as f:
+                f.write(text)
+            os.replace(tmp, path)
+        except OSError:
+            # A cache that cannot be written is just a cache miss next time.
+            return
+        self.evict()
+
+    def evict(self):
+        """Delete least recently used entries until the cache fits in ``max_bytes``."""
+        entries = []
+        total = 0
+        for path in self.root.glob("*/*.md"):
+            try:
+                st = path.stat()
+            except OSError:
+                continue
+            entries.append((st.st_mtime_ns, st.st_size, path))
+            total += st.st_size
+        if total <= self.max_bytes:
+            return
+        entries.sort()
+        for _, size, path in entries:
+            if total <= self.max_bytes:
+                break
+            try:
+                path.unlink()
+            except OSError:
+                continue
+            total -= size
+
+
+# ---------- Section Manifests ----------
+#
+# Incremental recompression needs to know what the original looked like when
+# the compressed file was produced. A manifest records the per-section hashes
+# of that original plus a hash of the compressed output, so a hand-edited
+# compressed file is detected and triggers a full recompression instead.
+
+
+def text_hash(text: str) -> str:
+    return hashlib.sha256(text.encode("utf-8", errors="surrogatepass")).hexdigest()
+
+
+def manifest_path(filepath: Path) -> Path:
+    key = hashlib.sha256(str(filepath.resolve()).encode("utf-8")).hexdigest()
+    return cache_dir() / "manifests" / f"{key}.json"
+
+
+def load_manifest(filepath: Path, compressed: str) -> Optional[List[str]]:
+    """Return the stored section hashes, or None if missing or stale."""
+    try:
+        data = json.loads(manifest_path(filepath).read_text(encoding="utf-8"))
+    except (OSError, ValueError):
+        return None
+    if data.get("version") != MANIFEST_VERSION or data.get("compressed") != text_hash(compressed):
+        return None
+    sections = data.get("sections")
+    return sections if isinstance(sections, list) else None
+
+
+def save_manifest(filepath: Path, hashes: List[str], compressed: str):
+    path = manifest_path(filepath)
+    data = {
+        "version": MANIFEST_VERSION,
+        "path": str(filepath.resolve()),
+        "sections": hashes,
+        "compressed": text_hash(compressed),
+    }
+    try:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        fd, tmp = tempfile.mkstemp(dir=path.parent, suffix=".tmp")
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
+            json.dump(data, f)
+        os.replace(tmp, path)
+    except OSError:
+        pass
+
+
+# ---------- Benchmark Counts ----------
+#
+# benchmark.py scores the same unchanged pairs run after run. Token counts are
+# keyed by tokenizer name and content hash, validation verdicts by both content
+# hashes and a fingerprint of the validator, so nothing here can go stale.
+
+BENCH_CACHE_VERSION = 1
+BENCH_CACHE_MAX_ENTRIES = 200_000
+
+
+class BenchmarkCache:
+    """Persistent token counts and validation verdicts for benchmark runs, saved as one JSON file."""
+
+    def __init__(self, path: Optional[Path] = None):
+        self.path = path or cache_dir() / "benchmark.json"
+        self.tokens: Dict[str, int] = {}
+        self.verdicts: Dict[str, bool] = {}
+        self.fresh_tokens: Dict[str, int] = {}  # added since load, for merging across processes
+        self.fresh_verdicts: Dict[str, bool] = {}
+        self.dirty = False
+        try:
+            data = json.loads(self.path.read_text(encoding="utf-8"))
+        except (OSError, ValueError):
+            return
+        if not isinstance(data, dict) or data.get("version") != BENCH_CACHE_VERSION:
+            return
+        self.tokens = data.get("tokens") or {}
+        self.verdicts = data.get("verdicts") or {}
+
+    def get_tokens(self, tokenizer: str, digest: str) -> Optional[int]:
+        return self.tokens.get(f"{tokenizer}:{digest}")
+
+    def put_tokens(self, tokenizer: str, digest: str, count: int):
+        key = f"{tokenizer}:{digest}"
+        self.tokens[key] = self.fresh_tokens[key] = count
+        self.dirty = True
+
+    def get_verdict(self, key: str) -> Optional[bool]:
+        return self.verdicts.get(key)
+
+    def put_verdict(self, key: str, valid: bool):
+        self.verdicts[key] = self.fresh_verdicts[key] = valid
+        self.dirty = True
+
+    def take_fresh(self):
+        """Return and clear ``(tokens, verdicts)`` added since the last call."""
+        fresh = (self.fresh_tokens, self.fresh_verdicts)
+        self.fresh_tokens, self.fresh_verdicts = {}, {}
+        return fresh
+
+    def merge(self, tokens: Dict[str, int], verdicts: Dict[str, bool]):
+        """Adopt entries computed by another process."""
+        if tokens or verdicts:
+            self.tokens.update(tokens)
+            self.verdicts.update(verdicts)
+            self.dirty = True
+
+    @staticmethod
+    def _trim(entries: dict) -> dict:
+        # Dicts keep insertion order, so the oldest entries go first.
+        excess = len(entries) - BENCH_CACHE_MAX_ENTRIES
+        return dict(list(entries.items())[excess:]) if excess > 0 else entries
+
+    def save(self):
+        if not self.dirty:
+            return
+        data = {
+            "version": BENCH_CACHE_VERSION,
+            "tokens": self._trim(self.tokens),
+            "verdicts": self._trim(self.verdicts),
+        }
+        try:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            fd, tmp = tempfile.mkstemp(dir=self.path.parent, suffix=".tmp")
+            with os.fdopen(fd, "w", encoding="utf-8") as f:
+                json.dump(data, f)
+            os.replace(tmp, self.path)
+        except OSError:
+            return
+        self.dirty = False
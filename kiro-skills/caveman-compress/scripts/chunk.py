@@ -0,0 +1,149 @@
+#!/usr/bin/env python3
+"""Split markdown into heading sections and pack them into compressible chunks.
+
+Splitting is lossless: ``"".join(split_sections(text)) == text``. Boundaries
+are only placed on heading lines or blank lines outside fenced code blocks, so
+a fence is never cut in half.
+"""
+
+import hashlib
+from typing import Iterator, List, Tuple
+
+from .validate import FENCE_OPEN_REGEX, HEADING_REGEX
+
+DEFAULT_CHUNK_CHARS = 12_000
+
+
+# Line roles yielded by ``iter_lines``.
+PROSE, FENCE_OPEN, FENCE_BODY, FENCE_CLOSE = "prose", "open", "body", "close"
+
+
+def iter_lines(text: str) -> Iterator[Tuple[str, str]]:
+    """Yield ``(line, role)`` for each line, keeping line endings.
+
+    ``role`` is PROSE outside code fences, otherwise FENCE_OPEN, FENCE_BODY or
+    FENCE_CLOSE, using the same CommonMark rules as
+    ``validate.extract_code_blocks``.
+    """
+    fence = None  # (char, length) of the open fence
+    for line in text.splitlines(keepends=True):
+        m = FENCE_OPEN_REGEX.match(line.rstrip("\r\n"))
+        if fence is None:
+            if m:
+                fence = (m.group(2)[0], len(m.group(2)))
+                yield line, FENCE_OPEN
+            else:
+                yield line, PROSE
+        elif (
+            m
+            and m.group(2)[0] == fence[0]
+            and len(m.group(2)) >= fence[1]
+            and m.group(3).strip() == ""
+        ):
+            fence = None
+            yield line, FENCE_CLOSE
+        else:
+            yield line, FENCE_BODY
+
+
+def _walk_lines(text: str) -> Iterator[Tuple[str, bool]]:
+    """Yield ``(line, in_fence)`` for each line, keeping line endings."""
+    for line, role in iter_lines(text):
+        yield line, role != PROSE
+
+
+def is_heading_line(line: str) -> bool:
+    return HEADING_REGEX.match(line.rstrip("\r\n")) is not None
+
+
+def split_sections(text: str) -> List[str]:
+    """Split ``text`` before every heading that is not inside a code fence.
+
+    Any preamble before the first heading becomes its own section.
+    """
+    sections = []
+    current = []
+    for line, in_fence in _walk_lines(text):
+        if not in_fence and current and is_heading_line(line):
+            sections.append("".join(current))
+            current = []
+        current.append(line)
+    if current:
+        sections.append("".join(current))
+    return sections
+
+
+def _split_paragraphs(section: str) -> List[str]:
+    """Split a section after blank lines that sit outside code fences."""
+    parts = []
+    current = []
+    for line, in_fence in _walk_lines(section):
+        current.append(line)
+        if not in_fence and not line.strip():
+            parts.append("".join(current))
+            current = []
+    if current:
+        parts.append("".join(current))
+    return parts
+
+
+def pack_chunks(sections: List[str], max_chars: int = DEFAULT_CHUNK_CHARS) -> List[str]:
+    """Greedily merge consecutive sections into chunks of at most ``max_chars``.
+
+    A section larger than ``max_chars`` is split at paragraph boundaries; a
+    single paragraph (or code block) larger than the limit is kept whole.
+    """
+    pieces = []
+    for section in sections:
+        if len(section) > max_chars:
+            pieces.extend(_split_paragraphs(section))
+        else:
+            pieces.append(section)
+
+    chunks = []
+    current = ""
+    for piece in pieces:
+        if current and len(current) + len(piece) > max_chars:
+            chunks.append(current)
+            current = ""
+        current += piece
+    if current:
+        chunks.append(current)
+    return chunks
+
+
+def has_prose(chunk: str) -> bool:
+    """True if the chunk has any non-blank line outside fences that is not a heading."""
+    return any(
+        not in_fence and line.strip() and not is_heading_line(line)
+        for line, in_fence in _walk_lines(chunk)
+    )
+
+
+def split_outer_whitespace(chunk: str) -> Tuple[str, str, str]:
+    """Return ``(leading, body, trailing)`` whitespace around a chunk.
+
+    Model output is stripped, so the original surrounding whitespace is kept
+    aside and re-attached to preserve spacing between reassembled chunks.
+    """
+    body = chunk.strip()
+    if not body:
+        return chunk, "", ""
+    start = chunk.index(body)
+    return chunk[:start], body, chunk[start + len(body):]
+
+
+def split_sections_with_preamble(text: str) -> List[str]:
+    """Like ``split_sections`` but always starts with a (possibly empty) preamble.
+
+    Model output is stripped, so a compressed file may lose the blank preamble
+    its original had. Normalising both sides keeps sections index-aligned.
+    """
+    sections = split_sections(text)
+    if not sections or is_heading_line(sections[0].splitlines()[0]):
+        sections.insert(0, "")
+    return sections
+
+
+def section_hashes(sections: List[str]) -> List[str]:
+    return [hashlib.sha256(s.encode("utf-8", errors="surrogatepass")).hexdigest() for s in sections]
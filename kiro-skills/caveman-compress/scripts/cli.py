@@ -3,7 +3,11 @@
 Caveman Compress CLI
 
 Usage:
-    caveman <filepath>
+    caveman [--no-cache] [--incremental] <filepath>
+    caveman [--jobs N] <path> [<path> ...]
+    caveman --recursive [--jobs N] <dir> [<dir> ...]
+    caveman --backend mock <path>    # offline, deterministic, no tokens
+    caveman stats [--by model|backend|status|day|file] [--since 7d] [--json]
 """
 
 import sys
@@ -19,22 +23,115 @@ for _stream in (sys.stdout, sys.stderr):
         except Exception:
             pass
 
+import argparse
+import time
 from pathlib import Path
 
+from .backends import BACKEND_NAMES, set_backend
+from .batch import collect_targets, compress_many, compressed_sibling, default_jobs, print_summary
 from .compress import compress_file
 from .detect import detect_file_type, should_compress
+from .telemetry import stats_main
 
 
 def print_usage():
-    print("Usage: caveman <filepath>")
+    print("Usage: caveman [--recursive] [--jobs N] [--no-cache] <path> [<path> ...]")
+    print("       caveman stats [--by FIELD] [--since 7d] [--json]")
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(prog="caveman", add_help=True)
+    parser.add_argument("paths", nargs="*", type=Path)
+    parser.add_argument("-r", "--recursive", action="store_true",
+                        help="walk directories and compress every natural-language file")
+    parser.add_argument("-j", "--jobs", type=int, default=None,
+                        help="files compressed concurrently (default: $CAVEMAN_JOBS or 4)")
+    parser.add_argument("--no-cache", dest="use_cache", action="store_false",
+                        help="always call the model, ignoring ~/.cache/caveman")
+    parser.add_argument("--incremental", action="store_true",
+                        help="recompress only the sections edited in FILE.original.md")
+    chunk = parser.add_mutually_exclusive_group()
+    chunk.add_argument("--chunked", dest="chunked", action="store_const", const=True, default=None,
+                       help="compress section by section with concurrent requests")
+    chunk.add_argument("--no-chunk", dest="chunked", action="store_const", const=False,
+                       help="send the whole file in one prompt (max 500KB)")
+    parser.add_argument("--backend", choices=BACKEND_NAMES, default=None,
+                        help="model backend (default: $CAVEMAN_BACKEND or auto; 'mock' runs offline)")
+    return parser
+
+
+def run_batch(paths, recursive: bool, jobs, **kwargs):
+    missing = [p for p in paths if not p.exists()]
+    for p in missing:
+        print(f"❌ Not found: {p}")
+    # Without --recursive a directory is not walked; say so instead of dropping it.
+    dirs = [] if recursive else [p for p in paths if p.is_dir()]
+    for p in dirs:
+        print(f"❌ Not a file: {p} (use --recursive to walk directories)")
+    if missing or dirs:
+        sys.exit(1)
+
+    targets = collect_targets(
+        paths, recursive=recursive, use_index=kwargs.get("use_cache", True), incremental=kwargs.get("incremental", False)
+    )
+    if not targets:
+        print("No compressible files found.")
+        sys.exit(0)
+
+    jobs = jobs or default_jobs()
+    print(f"Compressing {len(targets)} file(s) with {jobs} worker(s)...\n")
+
+    def report(res):
+        if res.status == "compressed":
+            print(f"✅ {res.path} ({res.elapsed:.1f}s)")
+        elif res.status == "skipped":
+            print(f"⏭️ {res.path}: skipped")
+        elif res.status == "failed":
+            print(f"❌ {res.path}: compression failed ({res.elapsed:.1f}s)")
+        else:
+            print(f"❌ {res.path}: {res.error}")
+
+    start = time.perf_counter()
+    try:
+        results = compress_many(targets, jobs=jobs, on_result=report, **kwargs)
+    except KeyboardInterrupt:
+        print("\nInterrupted by user")
+        sys.exit(130)
+    print_summary(results, time.perf_counter() - start)
+
+    if any(r.status == "error" for r in results):
+        sys.exit(1)
+    if any(r.status == "failed" for r in results):
+        sys.exit(2)
+    sys.exit(0)
 
 
 def main():
-    if len(sys.argv) != 2:
+    # `stats` reads the telemetry log; everything else compresses.
+    if sys.argv[1:2] == ["stats"]:
+        sys.exit(stats_main(sys.argv[2:]))
+
+    parser = build_parser()
+    args = parser.parse_args()
+    if args.jobs is not None and args.jobs < 1:
+        parser.error("--jobs must be at least 1")
+    if not args.paths:
         print_usage()
         sys.exit(1)
+    if args.backend:
+        set_backend(args.backend)
+
+    # A single file keeps the original interactive flow; anything else is a batch.
+    if args.recursive or len(args.paths) > 1:
+        run_batch(
+            args.paths, args.recursive, args.jobs,
+            use_cache=args.use_cache, chunked=args.chunked, incremental=args.incremental,
+        )
 
-    filepath = Path(sys.argv[1])
+    filepath = args.paths[0]
+    # Pointing --incremental at the edited backup means its compressed sibling.
+    if args.incremental:
+        filepath = compressed_sibling(filepath)
 
     # Check file exists
     if not filepath.exists():
@@ -60,7 +157,9 @@ def main():
     print("Starting caveman compression...\n")
 
     try:
-        success = compress_file(filepath)
+        success = compress_file(
+            filepath, use_cache=args.use_cache, chunked=args.chunked, incremental=args.incremental
+        )
 
         if success:
             print("\nCompression completed successfully")
@@ -68,6 +167,9 @@ def main():
             print(f"Compressed: {filepath}")
             print(f"Original:   {backup_path}")
             sys.exit(0)
+        elif success is None:
+            print("\nNothing to do: file skipped")
+            sys.exit(0)
         else:
             print("\n❌ Compression failed after retries")
             sys.exit(2)
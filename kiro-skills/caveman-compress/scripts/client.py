@@ -0,0 +1,255 @@
+#!/usr/bin/env python3
+"""Shared async Anthropic engine with rate limiting and retries.
+
+One ``anthropic.AsyncAnthropic`` client (and its HTTP connection pool) lives
+for the whole process on a background event loop. Every request first waits
+on two token buckets — requests per minute and estimated input tokens per
+minute — so batch and chunked runs stay under the account limits instead of
+tripping them. 429/529 and transient 5xx/connection failures are retried with
+jittered exponential backoff, honouring ``retry-after`` when the API sends it.
+
+Synchronous callers use ``ClaudeEngine.complete``; the engine schedules the
+request on its loop and blocks the calling thread until it finishes, so thread
+pools elsewhere in the package keep working unchanged. Passing a
+``StreamGuard`` streams the response through it so bad generations are
+abandoned mid-stream.
+
+The SDK honours ``ANTHROPIC_BASE_URL``, which lets the engine run against a
+local stub server standing in for the API.
+"""
+
+import asyncio
+import atexit
+import os
+import random
+import threading
+import time
+from concurrent.futures import Future
+from typing import Callable, Optional, Tuple
+
+from .stream import StreamAborted, StreamGuard
+
+DEFAULT_RPM = 50
+DEFAULT_TPM = 40_000
+DEFAULT_MAX_RETRIES = 5
+DEFAULT_MAX_TOKENS = 8192
+
+BACKOFF_BASE = 1.0  # seconds
+BACKOFF_MAX = 60.0
+
+# Rate limited, overloaded, or a transient server/proxy failure.
+RETRYABLE_STATUS = frozenset({408, 409, 429, 500, 502, 503, 504, 529})
+
+
+def _env_int(name: str, default: int) -> int:
+    try:
+        return int(os.environ.get(name, default))
+    except ValueError:
+        return default
+
+
+def estimate_tokens(text: str) -> int:
+    """Rough input token count (~4 chars per token) used for TPM budgeting."""
+    return len(text) // 4 + 1
+
+
+def backoff_delay(attempt: int, retry_after: Optional[float] = None) -> float:
+    """Full-jitter exponential backoff, never shorter than ``retry_after``."""
+    delay = random.uniform(0, min(BACKOFF_MAX, BACKOFF_BASE * (2 ** attempt)))
+    if retry_after is not None:
+        delay = max(delay, retry_after)
+    return delay
+
+
+def _retry_after(error) -> Optional[float]:
+    response = getattr(error, "response", None)
+    headers = getattr(response, "headers", None) or {}
+    try:
+        return float(headers.get("retry-after"))
+    except (TypeError, ValueError):
+        return None
+
+
+class TokenBucket:
+    """Async token bucket refilled continuously at ``per_minute`` tokens per minute.
+
+    Waiters are served in FIFO order. A request larger than the bucket's
+    capacity is clamped to the capacity so it can still eventually run.
+    """
+
+    def __init__(self, per_minute: int):
+        self.capacity = float(max(1, per_minute))
+        self.rate = self.capacity / 60.0
+        self.tokens = self.capacity
+        self.updated = time.monotonic()
+        self._lock = asyncio.Lock()
+
+    def _refill(self):
+        now = time.monotonic()
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    async def acquire(self, amount: float = 1):
+        amount = min(float(amount), self.capacity)
+        async with self._lock:
+            while True:
+                self._refill()
+                if self.tokens >= amount:
+                    self.tokens -= amount
+                    return
+                await asyncio.sleep((amount - self.tokens) / self.rate)
+
+
+class ClaudeEngine:
+    """Process-wide async client running on its own event-loop thread."""
+
+    def __init__(
+        self,
+        api_key: str,
+        rpm: Optional[int] = None,
+        tpm: Optional[int] = None,
+        max_retries: Optional[int] = None,
+        max_tokens: int = DEFAULT_MAX_TOKENS,
+    ):
+        import anthropic  # ImportError propagates so callers can fall back to the CLI
+
+        self._anthropic = anthropic
+        self.max_tokens = max_tokens
+        self.max_retries = max_retries if max_retries is not None else _env_int("CAVEMAN_MAX_RETRIES", DEFAULT_MAX_RETRIES)
+        self._rpm = rpm or _env_int("CAVEMAN_RPM", DEFAULT_RPM)
+        self._tpm = tpm or _env_int("CAVEMAN_TPM", DEFAULT_TPM)
+
+        self._pending = 0
+        self._in_flight = 0
+        self._counter_lock = threading.Lock()
+
+        self._loop = asyncio.new_event_loop()
+        self._thread = threading.Thread(target=self._loop.run_forever, name="caveman-engine", daemon=True)
+        self._thread.start()
+        # Build the client and buckets on the engine loop so they bind to it.
+        self._client, self._rpm_bucket, self._tpm_bucket = asyncio.run_coroutine_threadsafe(
+            self._setup(api_key), self._loop
+        ).result()
+
+    async def _setup(self, api_key: str):
+        client = self._anthropic.AsyncAnthropic(api_key=api_key, max_retries=0)
+        return client, TokenBucket(self._rpm), TokenBucket(self._tpm)
+
+    # ---------- Introspection ----------
+
+    @property
+    def queue_depth(self) -> int:
+        """Requests submitted but not finished (waiting on limits, backing off, or in flight)."""
+        return self._pending
+
+    @property
+    def in_flight(self) -> int:
+        """Requests currently on the wire."""
+        return self._in_flight
+
+    def _adjust(self, pending: int = 0, in_flight: int = 0):
+        with self._counter_lock:
+            self._pending += pending
+            self._in_flight += in_flight
+
+    # ---------- Requests ----------
+
+    async def _create(self, model: str, prompt: str):
+        return await self._client.messages.create(
+            model=model,
+            max_tokens=self.max_tokens,
+            messages=[{"role": "user", "content": prompt}],
+        )
+
+    async def _stream(self, model: str, prompt: str, guard: StreamGuard):
+        async with self._client.messages.stream(
+            model=model,
+            max_tokens=self.max_tokens,
+            messages=[{"role": "user", "content": prompt}],
+        ) as stream:
+            async for text in stream.text_stream:
+                guard.feed(text)  # StreamAborted closes the stream on the way out
+            return await stream.get_final_message()
+
+    async def _complete(
+        self, model: str, prompt: str, guard: Optional[StreamGuard], on_retry: Optional[Callable[[], None]]
+    ) -> Tuple[str, object]:
+        errors = self._anthropic
+        cost = estimate_tokens(prompt)
+        try:
+            for attempt in range(self.max_retries + 1):
+                await self._rpm_bucket.acquire(1)
+                await self._tpm_bucket.acquire(cost)
+                self._adjust(in_flight=1)
+                try:
+                    if guard is None:
+                        msg = await self._create(model, prompt)
+                        return msg.content[0].text, getattr(msg, "usage", None)
+                    if attempt:
+                        guard.reset()
+                    msg = await self._stream(model, prompt, guard)
+                    return guard.finish(), getattr(msg, "usage", None)
+                except StreamAborted:
+                    guard.close()
+                    raise
+                except errors.APIStatusError as e:
+                    if e.status_code not in RETRYABLE_STATUS or attempt == self.max_retries:
+                        raise
+                    delay = backoff_delay(attempt, _retry_after(e))
+                except errors.APIConnectionError:
+                    if attempt == self.max_retries:
+                        raise
+                    delay = backoff_delay(attempt)
+                finally:
+                    self._adjust(in_flight=-1)
+                if on_retry is not None:
+                    on_retry()
+                await asyncio.sleep(delay)
+            raise RuntimeError("unreachable")
+        finally:
+            self._adjust(pending=-1)
+
+    def submit(
+        self,
+        model: str,
+        prompt: str,
+        guard: Optional[StreamGuard] = None,
+        on_retry: Optional[Callable[[], None]] = None,
+    ) -> "Future[Tuple[str, object]]":
+        """Schedule a request; the future resolves to ``(text, usage)``.
+
+        With a ``guard`` the response is streamed through it and the future
+        raises ``StreamAborted`` if the guard gives up. ``on_retry`` is called
+        (on the engine's loop thread) before each backoff.
+        """
+        self._adjust(pending=1)
+        return asyncio.run_coroutine_threadsafe(self._complete(model, prompt, guard, on_retry), self._loop)
+
+    def complete(self, model: str, prompt: str, guard: Optional[StreamGuard] = None) -> str:
+        """Blocking helper: submit and wait for the response text."""
+        text, _usage = self.submit(model, prompt, guard).result()
+        return text
+
+    def close(self):
+        if not self._loop.is_running():
+            return
+        try:
+            asyncio.run_coroutine_threadsafe(self._client.close(), self._loop).result(timeout=5)
+        except Exception:
+            pass
+        self._loop.call_soon_threadsafe(self._loop.stop)
+        self._thread.join(timeout=5)
+
+
+_engine: Optional[ClaudeEngine] = None
+_engine_lock = threading.Lock()
+
+
+def get_engine(api_key: str) -> ClaudeEngine:
+    """Return the process-wide engine, creating it on first use."""
+    global _engine
+    with _engine_lock:
+        if _engine is None:
+            _engine = ClaudeEngine(api_key)
+            atexit.register(_engine.close)
+        return _engine
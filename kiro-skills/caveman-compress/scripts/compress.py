@@ -6,11 +6,15 @@ Usage:
     python scripts/compress.py <filepath>
 """
 
+import locale
 import os
 import re
-import subprocess
+import stat
+import tempfile
+from concurrent.futures import ThreadPoolExecutor
+from difflib import SequenceMatcher
 from pathlib import Path
-from typing import List
+from typing import List, Optional, Tuple
 
 OUTER_FENCE_REGEX = re.compile(
     r"\A\s*(`{3,}|~{3,})[^\n]*\n(.*)\n\1\s*\Z", re.DOTALL
@@ -63,45 +67,63 @@ def strip_llm_wrapper(text: str) -> str:
         return m.group(2)
     return text
 
+from . import telemetry
+from .backends import get_backend
+from .cache import ResultCache, cache_key, load_manifest, save_manifest
+from .chunk import (
+    DEFAULT_CHUNK_CHARS,
+    has_prose,
+    is_heading_line,
+    pack_chunks,
+    section_hashes,
+    split_outer_whitespace,
+    split_sections,
+    split_sections_with_preamble,
+)
 from .detect import should_compress
-from .validate import validate
+from .mask import mask_protected, unmask
+from .repair import repair
+from .stream import StreamAborted, StreamGuard
+from .validate import ValidationResult, validate_text
 
 MAX_RETRIES = 2
 
+# Local repair rounds per validation attempt, each re-validating the result.
+REPAIR_PASSES = 2
+
+MAX_FILE_SIZE = 500_000  # 500KB — whole file in a single prompt
+MAX_CHUNKED_FILE_SIZE = 10_000_000  # 10MB — chunked mode
+
+# Concurrent chunk requests per file; $CAVEMAN_JOBS overrides.
+DEFAULT_CHUNK_JOBS = 4
+
+# Bump whenever build_compress_prompt changes meaningfully so cached results
+# produced by the old prompt stop matching.
+PROMPT_VERSION = "2"
+
 
 # ---------- Claude Calls ----------
 
 
-def call_claude(prompt: str) -> str:
-    api_key = os.environ.get("ANTHROPIC_API_KEY")
-    if api_key:
-        try:
-            import anthropic
-
-            client = anthropic.Anthropic(api_key=api_key)
-            msg = client.messages.create(
-                model=os.environ.get("CAVEMAN_MODEL", "claude-sonnet-4-5"),
-                max_tokens=8192,
-                messages=[{"role": "user", "content": prompt}],
-            )
-            return strip_llm_wrapper(msg.content[0].text.strip())
-        except ImportError:
-            pass  # anthropic not installed, fall back to CLI
-    # Fallback: use claude CLI (handles desktop auth)
-    try:
-        result = subprocess.run(
-            ["claude", "--print"],
-            input=prompt,
-            text=True,
-            capture_output=True,
-            check=True,
-        )
-        return strip_llm_wrapper(result.stdout.strip())
-    except subprocess.CalledProcessError as e:
-        raise RuntimeError(f"Claude call failed:\n{e.stderr}")
+def call_claude(prompt: str, reference: Optional[str] = None, detect_echo: bool = False) -> str:
+    """Send ``prompt`` to Claude, streaming the response through a ``StreamGuard``.
+
+    ``reference`` is the input text the response is judged against (size, and
+    verbatim echo when ``detect_echo`` is set). Raises ``StreamAborted`` as soon
+    as the response is clearly unusable.
+    """
+    guard = StreamGuard(reference, detect_echo=detect_echo)
+    return strip_llm_wrapper(get_backend().complete(prompt, guard).strip())
+
+
+MASKED_RULE = (
+    "- Tokens like ⟦B0⟧, ⟦C1⟧, ⟦U2⟧ stand for code blocks, inline code and URLs. "
+    "Copy every token exactly once, unchanged, in the same place.\n"
+)
 
 
-def build_compress_prompt(original: str) -> str:
+def build_compress_prompt(original: str, masked: bool = False) -> str:
+    masked_rule = MASKED_RULE if masked else ""
     return f"""
 Compress this markdown into caveman format.
 
@@ -111,7 +133,7 @@ STRICT RULES:
 - Preserve ALL URLs exactly
 - Preserve ALL headings exactly
 - Preserve file paths and commands
-- Return ONLY the compressed markdown body — do NOT wrap the entire output in a ```markdown fence or any other fence. Inner code blocks from the original stay as-is; do not add a new outer fence around the whole file.
+{masked_rule}- Return ONLY the compressed markdown body — do NOT wrap the entire output in a ```markdown fence or any other fence. Inner code blocks from the original stay as-is; do not add a new outer fence around the whole file.
 
 Only compress natural language.
 
@@ -120,12 +142,19 @@ TEXT:
 """
 
 
-def build_fix_prompt(original: str, compressed: str, errors: List[str]) -> str:
+EXCERPT_RULE = (
+    "- ORIGINAL and COMPRESSED are matching excerpts (one or more sections) of a larger file; "
+    "return only the fixed excerpt\n"
+)
+
+
+def build_fix_prompt(original: str, compressed: str, errors: List[str], excerpt: bool = False) -> str:
     errors_str = "\n".join(f"- {e}" for e in errors)
+    excerpt_rule = EXCERPT_RULE if excerpt else ""
     return f"""You are fixing a caveman-compressed markdown file. Specific validation errors were found.
 
 CRITICAL RULES:
-- DO NOT recompress or rephrase the file
+{excerpt_rule}- DO NOT recompress or rephrase the file
 - ONLY fix the listed errors — leave everything else exactly as-is
 - The ORIGINAL is provided as reference only (to restore missing content)
 - Preserve caveman style in all untouched sections
@@ -149,17 +178,389 @@ Return ONLY the fixed compressed file. No explanation.
 """
 
 
+def call_compress(text: str) -> str:
+    """Compress ``text`` with code blocks, inline code and URLs masked out.
+
+    Protected spans are swapped for placeholders before the call and restored
+    locally afterwards, so they cost no tokens and cannot be mangled. A
+    placeholder the model dropped simply leaves its span missing, which
+    validation reports like any other lost code block or URL.
+    """
+    masked, spans = mask_protected(text)
+    out = call_claude(build_compress_prompt(masked, masked=bool(spans)), reference=masked, detect_echo=True)
+    if out is None or not spans:
+        return out
+    restored, missing = unmask(out, spans)
+    if missing:
+        print(f"⚠️ Claude dropped {len(missing)} protected span placeholder(s)")
+    return restored
+
+
+# ---------- Chunked Compression ----------
+
+
+def _chunk_jobs() -> int:
+    try:
+        return max(1, int(os.environ.get("CAVEMAN_JOBS", DEFAULT_CHUNK_JOBS)))
+    except ValueError:
+        return DEFAULT_CHUNK_JOBS
+
+
+def _compress_chunk(chunk: str) -> str:
+    if not has_prose(chunk):
+        return chunk  # headings/code only — nothing for the model to do
+    leading, body, trailing = split_outer_whitespace(chunk)
+    out = call_compress(body)
+    if out is None or not out.strip():
+        print("⚠️ Empty response for one chunk — keeping it uncompressed")
+        return chunk
+    return leading + out.strip() + trailing
+
+
+def compress_chunked(text: str, max_chars: int = DEFAULT_CHUNK_CHARS, jobs: Optional[int] = None) -> str:
+    """Compress ``text`` section by section, running chunk requests concurrently.
+
+    Chunks break only at headings (or blank lines) outside code fences and are
+    reassembled in their original order.
+    """
+    chunks = pack_chunks(split_sections(text), max_chars)
+    print(f"Compressing in {len(chunks)} chunk(s)...")
+    if len(chunks) == 1:
+        return _compress_chunk(chunks[0])
+    with ThreadPoolExecutor(max_workers=jobs or _chunk_jobs(), thread_name_prefix="caveman-chunk") as pool:
+        return "".join(pool.map(telemetry.propagate(_compress_chunk), chunks))
+
+
+def _compress_text(text: str, chunked: Optional[bool]) -> str:
+    if chunked is None:
+        chunked = len(text) > DEFAULT_CHUNK_CHARS
+    if chunked:
+        return compress_chunked(text)
+    return call_compress(text)
+
+
+# ---------- Targeted Fixes ----------
+#
+# A failed validation usually concerns one or two sections. Pairing the
+# original and compressed sections lets each fix prompt carry just the broken
+# regions instead of both whole files.
+
+
+def _heading_key(section: str) -> str:
+    first = section.split("\n", 1)[0]
+    return first.strip() if is_heading_line(first) else ""
+
+
+def _align_regions(orig_sections: List[str], comp_sections: List[str]) -> List[Tuple[str, str]]:
+    """Pair original and compressed sections into ``(original, compressed)`` regions.
+
+    Sections are matched by heading line. Where headings were lost, changed
+    or added, the unmatched sections fold into the preceding region, which is
+    where the model's output for them ended up.
+    """
+    matcher = SequenceMatcher(
+        None, [_heading_key(s) for s in orig_sections], [_heading_key(s) for s in comp_sections], autojunk=False
+    )
+    regions: List[List[List[str]]] = []
+    for tag, i1, i2, j1, j2 in matcher.get_opcodes():
+        if tag == "equal":
+            regions.extend([[orig_sections[i]], [comp_sections[j]]] for i, j in zip(range(i1, i2), range(j1, j2)))
+        elif regions:
+            regions[-1][0].extend(orig_sections[i1:i2])
+            regions[-1][1].extend(comp_sections[j1:j2])
+        else:
+            regions.append([orig_sections[i1:i2], comp_sections[j1:j2]])
+    return [("".join(o), "".join(c)) for o, c in regions]
+
+
+def _fix_region(original: str, compressed: str, errors: List[str]) -> str:
+    leading, body, trailing = split_outer_whitespace(compressed)
+    fixed = call_claude(build_fix_prompt(original.strip(), body, errors, excerpt=True), reference=original)
+    return leading + fixed.strip() + trailing
+
+
+def fix_compressed(original: str, compressed: str, errors: List[str]) -> str:
+    """Ask Claude to repair ``compressed``, sending only the regions that fail validation.
+
+    Each aligned region is validated on its own; failing regions are fixed
+    concurrently and spliced back in place. When no single region explains the
+    failure, the whole file goes to the model as before.
+    """
+    regions = _align_regions(split_sections_with_preamble(original), split_sections_with_preamble(compressed))
+    broken = []
+    for i, (orig_part, comp_part) in enumerate(regions):
+        result = validate_text(orig_part, comp_part)
+        if not result.is_valid:
+            broken.append((i, result.errors))
+
+    if not broken or len(regions) < 2:
+        return call_claude(build_fix_prompt(original, compressed, errors), reference=original)
+
+    fixed_chars = sum(len(regions[i][0]) + len(regions[i][1]) for i, _ in broken)
+    print(f"Fixing {len(broken)} of {len(regions)} section(s) ({fixed_chars} of {len(original) + len(compressed)} chars)...")
+    pieces = [comp_part for _, comp_part in regions]
+    with ThreadPoolExecutor(max_workers=_chunk_jobs(), thread_name_prefix="caveman-fix") as pool:
+        futures = [(i, pool.submit(telemetry.propagate(_fix_region), regions[i][0], regions[i][1], errs)) for i, errs in broken]
+        for i, future in futures:
+            pieces[i] = future.result()
+    return _join_sections(pieces)
+
+
+# ---------- Incremental Recompression ----------
+
+
+def _join_sections(pieces: List[str]) -> str:
+    """Concatenate sections, restoring the newline a stripped model output lost."""
+    out = []
+    for piece in pieces:
+        if out and out[-1] and not out[-1].endswith("\n") and piece:
+            out.append("\n")
+        out.append(piece)
+    return "".join(out)
+
+
+def _save_section_manifest(filepath: Path, original: str, compressed: str):
+    save_manifest(filepath, section_hashes(split_sections_with_preamble(original)), compressed)
+
+
+def _repair_locally(result: ValidationResult) -> Optional[str]:
+    """Restore code blocks, headings and URLs without a model call; None if nothing changed."""
+    repaired, actions = repair(result)
+    if not actions:
+        return None
+    print("Repaired locally: " + ", ".join(actions))
+    return repaired
+
+
+def _validate_and_fix(original: str, compressed: str) -> Optional[str]:
+    """Validate in memory, repairing locally first and then asking Claude; None if still invalid."""
+    for attempt in range(MAX_RETRIES):
+        print(f"\nValidation attempt {attempt + 1}")
+
+        with telemetry.phase("validate"):
+            result = validate_text(original, compressed)
+
+        if not result.is_valid:
+            print("❌ Validation failed:")
+            for err in result.errors:
+                print(f"   - {err}")
+            # A restored code fence can change what the rest of the text
+            # parses as, so a second pass catches what the first exposed.
+            for _ in range(REPAIR_PASSES):
+                with telemetry.phase("repair"):
+                    repaired = _repair_locally(result)
+                if repaired is None:
+                    break
+                compressed = repaired
+                with telemetry.phase("validate"):
+                    result = validate_text(original, compressed)
+                if result.is_valid:
+                    break
+
+        if result.is_valid:
+            print("Validation passed")
+            return compressed
+
+        if attempt == MAX_RETRIES - 1:
+            return None
+
+        print("Fixing with Claude...")
+        try:
+            with telemetry.phase("fix"):
+                compressed = fix_compressed(original, compressed, result.errors)
+        except StreamAborted as e:
+            print(f"❌ Fix aborted early: {e}")
+            return None
+    return None
+
+
+def _splice_changed_sections(filepath: Path, original_text: str, compressed_text: str, chunked: Optional[bool]) -> str:
+    """Recompress only the sections of ``original_text`` changed since the last run.
+
+    Returns ``compressed_text`` itself when no section changed.
+    """
+    old_hashes = load_manifest(filepath, compressed_text)
+    comp_sections = split_sections_with_preamble(compressed_text)
+    if old_hashes is None or len(old_hashes) != len(comp_sections):
+        print("No usable section manifest — recompressing the whole file")
+        return _compress_text(original_text, chunked)
+
+    new_sections = split_sections_with_preamble(original_text)
+    matcher = SequenceMatcher(None, old_hashes, section_hashes(new_sections), autojunk=False)
+    pieces = []
+    changed = []
+    for tag, i1, i2, j1, j2 in matcher.get_opcodes():
+        if tag == "equal":
+            pieces.extend(comp_sections[i1:i2])
+            continue
+        for j in range(j1, j2):
+            changed.append(len(pieces))
+            pieces.append(new_sections[j])
+
+    if not changed and len(pieces) == len(comp_sections):
+        return compressed_text
+
+    print(f"Recompressing {len(changed)} of {len(new_sections)} section(s)...")
+    with ThreadPoolExecutor(max_workers=_chunk_jobs(), thread_name_prefix="caveman-chunk") as pool:
+        for i, out in zip(changed, pool.map(telemetry.propagate(_compress_chunk), [pieces[i] for i in changed])):
+            pieces[i] = out
+    return _join_sections(pieces)
+
+
+def recompress_incremental(filepath: Path, backup_path: Path, use_cache: bool = True, chunked: Optional[bool] = None) -> bool:
+    """Bring ``filepath`` up to date with an edited ``backup_path``.
+
+    Sections of the backup are compared with the hashes recorded when the
+    compressed file was last written. Unchanged sections keep their existing
+    compressed text; only added or edited sections go to Claude, and the
+    spliced result is validated once as a whole. Without a usable manifest the
+    whole backup is recompressed.
+    """
+    with telemetry.phase("read"):
+        original_text = backup_path.read_text(errors="ignore")
+        compressed_text = filepath.read_text(errors="ignore")
+    telemetry.note(bytes_before=len(original_text.encode("utf-8")))
+
+    if not original_text.strip():
+        print("❌ Refusing to compress: backup is empty or whitespace-only.")
+        return False
+
+    cache = ResultCache() if use_cache else None
+    key = cache_key(original_text, get_backend().model, PROMPT_VERSION)
+    updated = cache.get(key) if cache else None
+    if updated is not None:
+        print("Cache hit — reusing previous compression")
+        telemetry.note(cache_hit=True)
+    else:
+        try:
+            with telemetry.phase("compress"):
+                updated = _splice_changed_sections(filepath, original_text, compressed_text, chunked)
+        except StreamAborted as e:
+            print(f"❌ Compression aborted early: {e}")
+            print("   Compressed file left unchanged.")
+            return False
+        if updated is compressed_text:
+            print("No section changes — compressed file is up to date")
+            telemetry.note(status="unchanged", bytes_after=len(compressed_text.encode("utf-8")))
+            return True
+
+    if updated is None or not updated.strip():
+        print("❌ Compression aborted: Claude returned an empty response.")
+        return False
+
+    validated = _validate_and_fix(original_text, updated)
+    if validated is None:
+        print("❌ Failed after retries — compressed file left unchanged")
+        return False
+
+    if validated == compressed_text:
+        print("Compressed file is already up to date")
+        telemetry.note(status="unchanged")
+    else:
+        try:
+            with telemetry.phase("write"):
+                atomic_write(filepath, validated, filepath.stat().st_mode)
+        except OSError as e:
+            print(f"❌ Could not write {filepath}: {e} — compressed file left unchanged")
+            return False
+    _save_section_manifest(filepath, original_text, validated)
+    if cache:
+        cache.put(key, validated)
+    telemetry.note(bytes_after=len(validated.encode("utf-8")))
+    return True
+
+
+# ---------- Safe Writes ----------
+#
+# Files are written to a temp file in the same directory, fsynced and moved
+# into place with os.replace, so a crash leaves either the old or the new file,
+# never half of one. Once fsync returns and the size matches, the write is
+# trusted; nothing is read back.
+
+
+def _encode_for_disk(text: str) -> bytes:
+    """The bytes ``Path.write_text(text)`` would produce on this platform."""
+    if os.linesep != "\n":
+        text = text.replace("\n", os.linesep)
+    return text.encode(locale.getpreferredencoding(False))
+
+
+def atomic_write(path: Path, text: str, mode: Optional[int] = None):
+    """Atomically replace ``path`` with ``text``; raises OSError if the bytes did not all land."""
+    data = _encode_for_disk(text)
+    fd, tmp = tempfile.mkstemp(dir=path.parent, prefix=f".{path.name}.", suffix=".tmp")
+    try:
+        with os.fdopen(fd, "wb") as f:
+            f.write(data)
+            f.flush()
+            os.fsync(f.fileno())
+            if os.fstat(f.fileno()).st_size != len(data):
+                raise OSError(f"short write: {len(data)} bytes expected in {tmp}")
+        if mode is not None:
+            os.chmod(tmp, stat.S_IMODE(mode))
+        os.replace(tmp, path)
+    except BaseException:
+        try:
+            os.unlink(tmp)
+        except OSError:
+            pass
+        raise
+    _fsync_dir(path.parent)
+
+
+def _fsync_dir(directory: Path):
+    """Persist the rename itself; not possible (or needed) on every platform."""
+    try:
+        fd = os.open(directory, os.O_RDONLY)
+    except OSError:
+        return
+    try:
+        os.fsync(fd)
+    except OSError:
+        pass
+    finally:
+        os.close(fd)
+
+
 # ---------- Core Logic ----------
 
 
-def compress_file(filepath: Path) -> bool:
+def compress_file(
+    filepath: Path,
+    use_cache: bool = True,
+    chunked: Optional[bool] = None,
+    incremental: bool = False,
+) -> Optional[bool]:
+    """Compress ``filepath`` in place, keeping a ``.original.md`` backup.
+
+    Returns True on success, False on failure and None when the file was
+    skipped (not natural language, or a backup already exists).
+
+    ``chunked`` forces (True) or disables (False) section-level chunking; by
+    default files longer than ``DEFAULT_CHUNK_CHARS`` are chunked. With
+    ``incremental``, an existing backup is treated as the edited source and
+    only its changed sections are recompressed.
+
+    Each call records one telemetry line (see ``telemetry``).
+    """
+    backend = get_backend()
+    with telemetry.track_run(filepath, backend.name, backend.model) as run:
+        ok = _compress_file(filepath, use_cache=use_cache, chunked=chunked, incremental=incremental)
+        if run.status is None:
+            run.status = "compressed" if ok else "skipped" if ok is None else "failed"
+        return ok
+
+
+def _compress_file(filepath: Path, use_cache: bool, chunked: Optional[bool], incremental: bool) -> Optional[bool]:
     # Resolve and validate path
     filepath = filepath.resolve()
-    MAX_FILE_SIZE = 500_000  # 500KB
     if not filepath.exists():
         raise FileNotFoundError(f"File not found: {filepath}")
-    if filepath.stat().st_size > MAX_FILE_SIZE:
-        raise ValueError(f"File too large to compress safely (max 500KB): {filepath}")
+    size = filepath.stat().st_size
+    if size > MAX_CHUNKED_FILE_SIZE:
+        raise ValueError(f"File too large to compress safely (max 10MB): {filepath}")
+    if chunked is False and size > MAX_FILE_SIZE:
+        raise ValueError(f"File too large to compress in one prompt (max 500KB, use chunked mode): {filepath}")
 
     # Refuse files that look like they contain secrets or PII. Compressing ships
     # the raw bytes to the Anthropic API — a third-party boundary — so we fail
@@ -175,27 +576,51 @@ def compress_file(filepath: Path) -> bool:
 
     print(f"Processing: {filepath}")
 
-    if not should_compress(filepath):
+    with telemetry.phase("detect"):
+        compressible = should_compress(filepath)
+    if not compressible:
         print("Skipping (not natural language)")
-        return False
+        telemetry.note(status="skipped")
+        return None
 
-    original_text = filepath.read_text(errors="ignore")
+    with telemetry.phase("read"):
+        original_text = filepath.read_text(errors="ignore")
     backup_path = filepath.with_name(filepath.stem + ".original.md")
+    telemetry.note(bytes_before=len(original_text.encode("utf-8")))
 
     if not original_text.strip():
         print("❌ Refusing to compress: file is empty or whitespace-only.")
         return False
 
+    if incremental and backup_path.exists():
+        return recompress_incremental(filepath, backup_path, use_cache=use_cache, chunked=chunked)
+
     # Check if backup already exists to prevent accidental overwriting
     if backup_path.exists():
         print(f"⚠️ Backup file already exists: {backup_path}")
         print("The original backup may contain important content.")
         print("Aborting to prevent data loss. Please remove or rename the backup file if you want to proceed.")
-        return False
-
-    # Step 1: Compress
-    print("Compressing with Claude...")
-    compressed = call_claude(build_compress_prompt(original_text))
+        print("To update the compressed file from an edited backup, rerun with --incremental.")
+        telemetry.note(status="skipped")
+        return None
+
+    # Step 1: Compress (or reuse a validated result for identical input)
+    cache = ResultCache() if use_cache else None
+    key = cache_key(original_text, get_backend().model, PROMPT_VERSION)
+    cached = cache.get(key) if cache else None
+    if cached is not None:
+        print("Cache hit — reusing previous compression")
+        telemetry.note(cache_hit=True)
+        compressed = cached
+    else:
+        print("Compressing with Claude...")
+        try:
+            with telemetry.phase("compress"):
+                compressed = _compress_text(original_text, chunked)
+        except StreamAborted as e:
+            print(f"❌ Compression aborted early: {e}")
+            print("   Original file is untouched (no backup created).")
+            return False
 
     if compressed is None or not compressed.strip():
         print("❌ Compression aborted: Claude returned an empty response.")
@@ -208,47 +633,37 @@ def compress_file(filepath: Path) -> bool:
         print("   already in caveman form. Original file is untouched (no backup created).")
         return False
 
-    # Save original as backup, then verify the backup readback before
-    # touching the input file. If the filesystem dropped bytes (encoding,
-    # antivirus, disk full), unlink the bad backup and abort instead of
-    # leaving the user with a corrupt backup + compressed primary.
-    backup_path.write_text(original_text)
-    backup_readback = backup_path.read_text(errors="ignore")
-    if backup_readback != original_text:
-        print(f"❌ Backup write verification failed: {backup_path}")
-        print("   In-memory original differs from on-disk backup. Aborting before touching the input file.")
-        try:
-            backup_path.unlink()
-        except OSError:
-            pass
+    # Step 2: Validate + Retry, in memory — nothing is written until the
+    # output passes, so a failure leaves the original file untouched.
+    compressed = _validate_and_fix(original_text, compressed)
+    if compressed is None:
+        print("❌ Failed after retries — original file untouched (no backup created)")
         return False
-    filepath.write_text(compressed)
-
-    # Step 2: Validate + Retry
-    for attempt in range(MAX_RETRIES):
-        print(f"\nValidation attempt {attempt + 1}")
-
-        result = validate(backup_path, filepath)
 
-        if result.is_valid:
-            print("Validation passed")
-            break
-
-        print("❌ Validation failed:")
-        for err in result.errors:
-            print(f"   - {err}")
+    # Step 3: Save the original as backup before touching the input file. If
+    # the write fails or comes up short (disk full, quota), atomic_write raises
+    # and no backup is left behind, so abort instead of leaving the user with a
+    # corrupt backup + compressed primary.
+    mode = filepath.stat().st_mode
+    try:
+        with telemetry.phase("write"):
+            atomic_write(backup_path, original_text, mode)
+    except OSError as e:
+        print(f"❌ Backup write failed: {e}")
+        print("   Aborting before touching the input file.")
+        return False
 
-        if attempt == MAX_RETRIES - 1:
-            # Restore original on failure
-            filepath.write_text(original_text)
-            backup_path.unlink(missing_ok=True)
-            print("❌ Failed after retries — original restored")
-            return False
+    try:
+        with telemetry.phase("write"):
+            atomic_write(filepath, compressed, mode)
+    except OSError as e:
+        backup_path.unlink(missing_ok=True)
+        print(f"❌ Could not write {filepath}: {e} — original file untouched")
+        return False
 
-        print("Fixing with Claude...")
-        compressed = call_claude(
-            build_fix_prompt(original_text, compressed, result.errors)
-        )
-        filepath.write_text(compressed)
+    if cache and cached is None:
+        cache.put(key, compressed)
+    _save_section_manifest(filepath, original_text, compressed)
+    telemetry.note(bytes_after=len(compressed.encode("utf-8")))
 
     return True
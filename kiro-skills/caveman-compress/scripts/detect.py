@@ -2,8 +2,18 @@
 """Detect whether a file is natural language (compressible) or code/config (skip)."""
 
 import json
+import os
 import re
+import tempfile
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Tuple
+
+# Support both direct execution and module import
+try:
+    from .cache import cache_dir
+except ImportError:
+    from cache import cache_dir
 
 # Extensions that are natural language and compressible
 COMPRESSIBLE_EXTENSIONS = {".md", ".txt", ".markdown", ".rst", ".typ", ".typst", ".tex"}
@@ -17,6 +27,17 @@ SKIP_EXTENSIONS = {
     ".dockerfile", ".makefile", ".csv", ".ini", ".cfg",
 }
 
+# Extensionless files are classified from a bounded prefix, never read whole.
+# 64KB comfortably covers the 10,000 chars tried as JSON and the 50 lines scanned.
+SNIFF_BYTES = 64 * 1024
+SNIFF_JSON_CHARS = 10_000
+SNIFF_LINES = 50
+
+DEFAULT_DETECT_JOBS = 8
+
+# Bump whenever classification rules change so indexed results are discarded.
+INDEX_VERSION = 1
+
 # Patterns that indicate a line is code
 CODE_PATTERNS = [
     re.compile(r"^\s*(import |from .+ import |require\(|const |let |var )"),
@@ -29,9 +50,31 @@ CODE_PATTERNS = [
 ]
 
 
+# Every pattern above is ``^\s*`` + an alternative; one alternation tries them all in a single match.
+CODE_LINE_REGEX = re.compile(
+    r"^\s*(?:" + "|".join(p.pattern[len(r"^\s*"):] for p in CODE_PATTERNS) + ")"
+)
+
+# A stripped line counts toward YAML if it starts a document, is a `key: value`
+# pair, or is a list item holding a mapping.
+YAML_LINE_REGEX = re.compile(r"---|\w[\w\s]*:\s|- .*:")
+
+
 def _is_code_line(line: str) -> bool:
     """Check if a line looks like code."""
-    return any(p.match(line) for p in CODE_PATTERNS)
+    return CODE_LINE_REGEX.match(line) is not None
+
+
+def classify_lines(lines: List[str]) -> Tuple[int, int]:
+    """Return ``(non_empty, code)`` line counts.
+
+    Both counts run as C-level ``map`` passes rather than a Python loop; every
+    code match has a non-space character, so code lines are a subset of the
+    non-empty ones.
+    """
+    blank = lines.count("") + sum(map(str.isspace, lines))
+    code = sum(1 for _ in filter(None, map(CODE_LINE_REGEX.match, lines)))
+    return len(lines) - blank, code
 
 
 def _is_json_content(text: str) -> bool:
@@ -45,17 +88,10 @@ def _is_json_content(text: str) -> bool:
 
 def _is_yaml_content(lines: list[str]) -> bool:
     """Heuristic: check if content looks like YAML."""
-    yaml_indicators = 0
-    for line in lines[:30]:
-        stripped = line.strip()
-        if stripped.startswith("---"):
-            yaml_indicators += 1
-        elif re.match(r"^\w[\w\s]*:\s", stripped):
-            yaml_indicators += 1
-        elif stripped.startswith("- ") and ":" in stripped:
-            yaml_indicators += 1
+    stripped = list(map(str.strip, lines[:30]))
+    yaml_indicators = sum(1 for _ in filter(None, map(YAML_LINE_REGEX.match, stripped)))
     # If most non-empty lines look like YAML
-    non_empty = sum(1 for l in lines[:30] if l.strip())
+    non_empty = len(stripped) - stripped.count("")
     return non_empty > 0 and yaml_indicators / non_empty > 0.6
 
 
@@ -76,35 +112,163 @@ def detect_file_type(filepath: Path) -> str:
     # Extensionless files (like CLAUDE.md, TODO) — check content
     if not ext:
         try:
-            text = filepath.read_text(errors="ignore")
+            with open(filepath, "rb") as f:
+                head = f.read(SNIFF_BYTES)
         except (OSError, PermissionError):
             return "unknown"
+        return _classify_text(head.decode("utf-8", errors="ignore"))
 
-        lines = text.splitlines()[:50]
+    return "unknown"
 
-        if _is_json_content(text[:10000]):
-            return "config"
-        if _is_yaml_content(lines):
-            return "config"
 
-        code_lines = sum(1 for l in lines if l.strip() and _is_code_line(l))
-        non_empty = sum(1 for l in lines if l.strip())
-        if non_empty > 0 and code_lines / non_empty > 0.4:
-            return "code"
+def _classify_text(text: str) -> str:
+    """Classify the (prefix of the) content of an extensionless file."""
+    lines = text.splitlines()[:SNIFF_LINES]
 
-        return "natural_language"
+    if _is_json_content(text[:SNIFF_JSON_CHARS]):
+        return "config"
+    if _is_yaml_content(lines):
+        return "config"
 
-    return "unknown"
+    non_empty, code_lines = classify_lines(lines)
+    if non_empty > 0 and code_lines / non_empty > 0.4:
+        return "code"
+
+    return "natural_language"
+
+
+class ClassificationIndex:
+    """Persistent ``detect_file_type`` results for extensionless files.
+
+    Entries are keyed by absolute path and hold the file's size and
+    ``st_mtime_ns`` at classification time; any change to either makes the
+    entry miss, so repeat scans over a large tree only re-read changed files.
+    Files with an extension never enter the index — their lookup is cheaper
+    than the ``stat`` needed to validate an entry. Directories registered with
+    ``walked`` were listed in full, so on ``save`` their entries for files not
+    looked up this run (deleted or moved) are dropped.
+    """
+
+    def __init__(self, path: Optional[Path] = None):
+        self.path = path or cache_dir() / "detect-index.json"
+        self.entries: Dict[str, list] = {}
+        self.dirty = False
+        self.seen = set()
+        self.roots: List[str] = []
+        try:
+            data = json.loads(self.path.read_text(encoding="utf-8"))
+        except (OSError, ValueError):
+            return
+        if isinstance(data, dict) and data.get("version") == INDEX_VERSION:
+            self.entries = data.get("entries") or {}
+
+    def get(self, filepath: Path, st: os.stat_result) -> Optional[str]:
+        key = str(filepath.absolute())
+        self.seen.add(key)
+        entry = self.entries.get(key)
+        if entry and entry[0] == st.st_size and entry[1] == st.st_mtime_ns:
+            return entry[2]
+        return None
+
+    def put(self, filepath: Path, st: os.stat_result, file_type: str):
+        key = str(filepath.absolute())
+        self.seen.add(key)
+        self.entries[key] = [st.st_size, st.st_mtime_ns, file_type]
+        self.dirty = True
+
+    def walked(self, root: Path):
+        """Record that every file under ``root`` was looked up this run."""
+        self.roots.append(os.path.join(str(root.absolute()), ""))
+
+    def _prune(self):
+        stale = [
+            key for key in self.entries
+            if key not in self.seen and any(key.startswith(root) for root in self.roots)
+        ]
+        for key in stale:
+            del self.entries[key]
+        if stale:
+            self.dirty = True
+
+    def classify(self, filepath: Path) -> str:
+        """``detect_file_type`` through the index."""
+        if filepath.suffix:
+            return detect_file_type(filepath)
+        try:
+            st = filepath.stat()
+        except OSError:
+            return detect_file_type(filepath)
+        file_type = self.get(filepath, st)
+        if file_type is None:
+            file_type = detect_file_type(filepath)
+            self.put(filepath, st, file_type)
+        return file_type
+
+    def save(self):
+        self._prune()
+        if not self.dirty:
+            return
+        try:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            fd, tmp = tempfile.mkstemp(dir=self.path.parent, suffix=".tmp")
+            with os.fdopen(fd, "w", encoding="utf-8") as f:
+                json.dump({"version": INDEX_VERSION, "entries": self.entries}, f)
+            os.replace(tmp, self.path)
+        except OSError:
+            return
+        self.dirty = False
+
+
+def detect_many(
+    paths: Iterable[Path], jobs: Optional[int] = None, index: Optional[ClassificationIndex] = None
+) -> List[str]:
+    """``detect_file_type`` for many paths, results in input order.
+
+    Extension lookups are answered inline; extensionless files are answered
+    from ``index`` when unchanged, and only the rest, which need a read, go to
+    a thread pool. The caller saves the index.
+    """
+    paths = list(paths)
+    results = [None] * len(paths)
+    pending = []
+    stats = {}
+    for i, path in enumerate(paths):
+        if path.suffix:
+            results[i] = detect_file_type(path)
+            continue
+        if index is not None:
+            try:
+                stats[i] = path.stat()
+            except OSError:
+                pass
+            else:
+                results[i] = index.get(path, stats[i])
+                if results[i] is not None:
+                    continue
+        pending.append(i)
+
+    if len(pending) < 2:
+        detected = [detect_file_type(paths[i]) for i in pending]
+    else:
+        jobs = jobs or min(DEFAULT_DETECT_JOBS, (os.cpu_count() or 1) * 2)
+        with ThreadPoolExecutor(max_workers=min(jobs, len(pending))) as pool:
+            detected = list(pool.map(detect_file_type, (paths[i] for i in pending)))
+    for i, file_type in zip(pending, detected):
+        results[i] = file_type
+        if i in stats:
+            index.put(paths[i], stats[i], file_type)
+    return results
 
 
-def should_compress(filepath: Path) -> bool:
+def should_compress(filepath: Path, index: Optional[ClassificationIndex] = None) -> bool:
     """Return True if the file is natural language and should be compressed."""
     if not filepath.is_file():
         return False
     # Skip backup files
     if filepath.name.endswith(".original.md"):
         return False
-    return detect_file_type(filepath) == "natural_language"
+    file_type = index.classify(filepath) if index is not None else detect_file_type(filepath)
+    return file_type == "natural_language"
 
 
 if __name__ == "__main__":
@@ -114,8 +278,9 @@ if __name__ == "__main__":
         print("Usage: python detect.py <file1> [file2] ...")
         sys.exit(1)
 
-    for path_str in sys.argv[1:]:
-        p = Path(path_str).resolve()
-        file_type = detect_file_type(p)
-        compress = should_compress(p)
+    index = ClassificationIndex()
+    paths = [Path(path_str).resolve() for path_str in sys.argv[1:]]
+    for p, file_type in zip(paths, detect_many(paths, index=index)):
+        compress = should_compress(p, index)
         print(f"  {p.name:30s} type={file_type:20s} compress={compress}")
+    index.save()
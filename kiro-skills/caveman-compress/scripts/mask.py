@@ -0,0 +1,90 @@
+#!/usr/bin/env python3
+"""Mask protected spans before text is sent to the model.
+
+Fenced code blocks, inline code and URLs must survive compression byte for
+byte, so they never need to travel to the model at all. ``mask_protected``
+swaps each one for a short placeholder such as ``⟦B0⟧``; ``unmask`` puts the
+original spans back locally once the compressed prose returns.
+"""
+
+import re
+from typing import List, Tuple
+
+from .chunk import FENCE_CLOSE, PROSE, iter_lines
+from .validate import URL_REGEX
+
+PLACEHOLDER_OPEN = "⟦"
+PLACEHOLDER_CLOSE = "⟧"
+PLACEHOLDER_REGEX = re.compile(r"⟦([BCU])(\d+)⟧")
+
+# Inline code (same shape validate.extract_inline_codes counts) or a URL.
+PROSE_SPAN_REGEX = re.compile(r"(`[^`]+`)|(" + URL_REGEX.pattern + r")")
+
+
+def _placeholder(kind: str, index: int) -> str:
+    return f"{PLACEHOLDER_OPEN}{kind}{index}{PLACEHOLDER_CLOSE}"
+
+
+def mask_protected(text: str) -> Tuple[str, List[str]]:
+    """Return ``(masked_text, spans)`` where ``spans[i]`` is restored for placeholder ``i``.
+
+    Text that already contains the placeholder bracket is returned unmasked so
+    a literal ``⟦`` in the source can never be confused with a placeholder.
+    """
+    if PLACEHOLDER_OPEN in text or PLACEHOLDER_CLOSE in text:
+        return text, []
+
+    spans: List[str] = []
+    out: List[str] = []
+
+    def add(kind: str, span: str) -> str:
+        spans.append(span)
+        return _placeholder(kind, len(spans) - 1)
+
+    def sub_prose(m: re.Match) -> str:
+        return add("C" if m.group(1) else "U", m.group(0))
+
+    prose: List[str] = []
+    block: List[str] = []
+
+    def flush_prose():
+        if prose:
+            out.append(PROSE_SPAN_REGEX.sub(sub_prose, "".join(prose)))
+            prose.clear()
+
+    def flush_block():
+        if block:
+            joined = "".join(block)
+            body = joined.rstrip("\r\n")
+            out.append(add("B", body) + joined[len(body):])
+            block.clear()
+
+    for line, role in iter_lines(text):
+        if role == PROSE:
+            flush_block()
+            prose.append(line)
+            continue
+        flush_prose()
+        block.append(line)
+        if role == FENCE_CLOSE:
+            flush_block()
+    flush_block()
+    flush_prose()
+    return "".join(out), spans
+
+
+def unmask(text: str, spans: List[str]) -> Tuple[str, List[int]]:
+    """Restore placeholders in ``text``; return the restored text and missing indices."""
+    if not spans:
+        return text, []
+    seen = set()
+
+    def restore(m: re.Match) -> str:
+        index = int(m.group(2))
+        if index >= len(spans):
+            return m.group(0)
+        seen.add(index)
+        return spans[index]
+
+    restored = PLACEHOLDER_REGEX.sub(restore, text)
+    return restored, [i for i in range(len(spans)) if i not in seen]
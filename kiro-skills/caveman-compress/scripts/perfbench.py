@@ -0,0 +1,249 @@
+#!/usr/bin/env python3
+"""Speed benchmarks for the local (no-token) hot paths of caveman-compress.
+
+Runs detection, line classification, validation, code block extraction, wrapper stripping and the
+sensitive-path check over synthetic markdown corpora from 1KB to 10MB, in a
+prose-heavy and a code-heavy flavour. Reports ops/sec, p50/p99 latency and
+peak traced memory; results can be written as JSON and compared against a
+saved baseline to catch regressions.
+
+Usage:
+    python3 -m scripts.perfbench [--quick] [--sizes 1K,100K] [--json out.json]
+                                 [--baseline base.json] [--tolerance 0.25]
+"""
+
+import argparse
+import json
+import platform
+import random
+import statistics
+import sys
+import tempfile
+import time
+import tracemalloc
+from pathlib import Path
+
+# Support both direct execution and module import
+try:
+    from .compress import is_sensitive_path, strip_llm_wrapper
+    from .detect import classify_lines, detect_file_type
+    from .validate import extract_code_blocks, parse_markdown, validate_text
+except ImportError:
+    sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+    from scripts.compress import is_sensitive_path, strip_llm_wrapper
+    from scripts.detect import classify_lines, detect_file_type
+    from scripts.validate import extract_code_blocks, parse_markdown, validate_text
+
+SIZES = {"1K": 1_000, "10K": 10_000, "100K": 100_000, "1M": 1_000_000, "10M": 10_000_000}
+QUICK_SIZES = ("1K", "10K", "100K")
+KINDS = ("prose", "code")
+
+MIN_TIME = 0.5  # seconds of timed runs per case
+MIN_ITERS = 3
+MAX_ITERS = 10_000
+
+WORDS = (
+    "the service handles incoming requests and routes them to workers "
+    "configuration lives in environment variables and must be validated "
+    "before deploy always run tests make sure cache is warm database "
+    "migrations are idempotent retry failed jobs with backoff"
+).split()
+
+SENSITIVE_SAMPLES = [
+    Path(p) for p in (
+        "README.md", "docs/guide.md", "CLAUDE.md", "notes/todo.txt",
+        ".env", "secrets.md", "config/credentials.json", "home/.ssh/id_rsa",
+        "api-key-notes.md", "deploy/server.pem", "src/app/main.py", "team/passwords.txt",
+    )
+]
+
+
+# ---------- Corpus ----------
+
+
+def _sentence(rng: random.Random) -> str:
+    words = rng.choices(WORDS, k=rng.randint(8, 20))
+    roll = rng.random()
+    if roll < 0.15:
+        words.insert(rng.randrange(len(words)), f"`{rng.choice(WORDS)}_{rng.randint(0, 99)}`")
+    elif roll < 0.25:
+        words.insert(rng.randrange(len(words)), f"https://example.com/{rng.choice(WORDS)}/{rng.randint(0, 999)}")
+    elif roll < 0.35:
+        words.insert(rng.randrange(len(words)), f"./src/{rng.choice(WORDS)}/{rng.choice(WORDS)}.py")
+    return " ".join(words).capitalize() + "."
+
+
+def _code_block(rng: random.Random) -> str:
+    lines = [f"def {rng.choice(WORDS)}_{i}(x):\n    return x + {i}" for i in range(rng.randint(2, 8))]
+    return "```python\n" + "\n".join(lines) + "\n```"
+
+
+def make_corpus(size: int, kind: str, seed: int = 0) -> str:
+    """Deterministic synthetic markdown of roughly ``size`` characters."""
+    rng = random.Random(f"{seed}-{kind}-{size}")
+    code_ratio = 0.7 if kind == "code" else 0.1
+    parts = []
+    total = 0
+    section = 0
+    while total < size:
+        if total == 0 or rng.random() < 0.1:
+            section += 1
+            part = f"{'#' * rng.randint(1, 3)} Section {section}"
+        elif rng.random() < code_ratio:
+            part = _code_block(rng)
+        elif rng.random() < 0.3:
+            part = "\n".join(f"- {_sentence(rng)}" for _ in range(rng.randint(2, 6)))
+        else:
+            part = " ".join(_sentence(rng) for _ in range(rng.randint(2, 5)))
+        parts.append(part)
+        total += len(part) + 2
+    return "\n\n".join(parts)[:size]
+
+
+# ---------- Measurement ----------
+
+
+def measure(fn, min_time: float = MIN_TIME) -> dict:
+    """Time ``fn`` repeatedly, then run it once more under tracemalloc for peak memory."""
+    fn()  # warm-up
+    samples = []
+    start = time.perf_counter()
+    while len(samples) < MAX_ITERS and (len(samples) < MIN_ITERS or time.perf_counter() - start < min_time):
+        t0 = time.perf_counter()
+        fn()
+        samples.append(time.perf_counter() - t0)
+
+    tracemalloc.start()
+    fn()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    samples.sort()
+    p99 = samples[min(len(samples) - 1, int(round(0.99 * (len(samples) - 1))))]
+    return {
+        "iterations": len(samples),
+        "ops_per_sec": len(samples) / sum(samples) if sum(samples) else float("inf"),
+        "p50_ms": statistics.median(samples) * 1000,
+        "p99_ms": p99 * 1000,
+        "peak_kb": peak / 1024,
+    }
+
+
+def run_suite(sizes, min_time: float = MIN_TIME, out=print) -> list:
+    results = []
+
+    def record(name: str, size_label: str, kind: str, fn):
+        stats = measure(fn, min_time)
+        row = {"name": name, "size": size_label, "kind": kind, **stats}
+        results.append(row)
+        out(format_row(row))
+
+    out(format_header())
+    record("is_sensitive_path", "-", "-", lambda: [is_sensitive_path(p) for p in SENSITIVE_SAMPLES])
+
+    with tempfile.TemporaryDirectory() as tmp:
+        for size_label in sizes:
+            for kind in KINDS:
+                text = make_corpus(SIZES[size_label], kind)
+                wrapped = "```markdown\n" + text + "\n```"
+                lines = text.splitlines()
+                sample = Path(tmp) / f"NOTES_{kind}_{size_label}"  # extensionless: content sniffing
+                sample.write_text(text)
+
+                record("detect_file_type", size_label, kind, lambda: detect_file_type(sample))
+                record("classify_lines", size_label, kind, lambda: classify_lines(lines))
+                record("parse_markdown", size_label, kind, lambda: parse_markdown(text))
+                record("extract_code_blocks", size_label, kind, lambda: extract_code_blocks(text))
+                record("validate", size_label, kind, lambda: validate_text(text, text))
+                record("strip_llm_wrapper", size_label, kind, lambda: strip_llm_wrapper(wrapped))
+    return results
+
+
+# ---------- Reporting ----------
+
+
+def format_header() -> str:
+    return (
+        f"\n{'Benchmark':<22} {'Size':>5} {'Kind':>6} {'ops/sec':>12} {'p50 ms':>10} {'p99 ms':>10} {'peak KB':>10}\n"
+        + "-" * 81
+    )
+
+
+def format_row(r: dict) -> str:
+    return (
+        f"{r['name']:<22} {r['size']:>5} {r['kind']:>6} {r['ops_per_sec']:>12.1f} "
+        f"{r['p50_ms']:>10.3f} {r['p99_ms']:>10.3f} {r['peak_kb']:>10.1f}"
+    )
+
+
+def _key(r: dict):
+    return (r["name"], r["size"], r["kind"])
+
+
+def compare(results: list, baseline: list, tolerance: float) -> list:
+    """Return human-readable regressions where p50 grew by more than ``tolerance``."""
+    base = {_key(r): r for r in baseline}
+    regressions = []
+    for r in results:
+        b = base.get(_key(r))
+        if not b or not b.get("p50_ms"):
+            continue
+        ratio = r["p50_ms"] / b["p50_ms"]
+        if ratio > 1 + tolerance:
+            name, size, kind = _key(r)
+            regressions.append(
+                f"{name} [{size}/{kind}]: p50 {b['p50_ms']:.3f}ms -> {r['p50_ms']:.3f}ms ({ratio:.2f}x)"
+            )
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--quick", action="store_true", help="only corpora up to 100K")
+    parser.add_argument("--sizes", help="comma-separated subset of " + ",".join(SIZES))
+    parser.add_argument("--min-time", type=float, default=MIN_TIME, help="seconds of timed runs per case")
+    parser.add_argument("--json", dest="json_out", type=Path, help="write results to this JSON file")
+    parser.add_argument("--baseline", type=Path, help="compare against a JSON file from a previous --json run")
+    parser.add_argument("--tolerance", type=float, default=0.25, help="allowed p50 slowdown before failing (default 0.25)")
+    args = parser.parse_args()
+
+    if args.sizes:
+        sizes = [s.strip().upper() for s in args.sizes.split(",") if s.strip()]
+        unknown = [s for s in sizes if s not in SIZES]
+        if unknown:
+            print(f"❌ Unknown size(s): {', '.join(unknown)}")
+            sys.exit(1)
+    else:
+        sizes = list(QUICK_SIZES if args.quick else SIZES)
+
+    results = run_suite(sizes, args.min_time)
+
+    if args.json_out:
+        payload = {
+            "meta": {
+                "python": platform.python_version(),
+                "platform": platform.platform(),
+                "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+            },
+            "results": results,
+        }
+        args.json_out.write_text(json.dumps(payload, indent=2))
+        print(f"\nResults written to {args.json_out}")
+
+    if args.baseline:
+        try:
+            baseline = json.loads(args.baseline.read_text())["results"]
+        except (OSError, ValueError, KeyError) as e:
+            print(f"❌ Cannot read baseline {args.baseline}: {e}")
+            sys.exit(1)
+        regressions = compare(results, baseline, args.tolerance)
+        if regressions:
+            print(f"\n❌ {len(regressions)} regression(s) beyond {args.tolerance:.0%}:")
+            for line in regressions:
+                print(f"   - {line}")
+            sys.exit(1)
+        print(f"\nNo regressions beyond {args.tolerance:.0%} against {args.baseline}")
+
+
+if __name__ == "__main__":
+    main()
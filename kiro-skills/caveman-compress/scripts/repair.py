@@ -0,0 +1,239 @@
+#!/usr/bin/env python3
+"""Repair mechanical validation failures locally, without a model call.
+
+Code blocks, headings and URLs must come through compression unchanged, and
+the original has the exact text of each. ``repair`` restores them in place:
+
+- code blocks are aligned with the original's and replaced, removed or
+  re-inserted so the sequence matches exactly
+- heading lines are restored by position; lost headings are re-inserted
+  before the next surviving heading and invented ones are dropped
+- a lost URL replaces a mangled look-alike when there is one, otherwise it is
+  re-added at the end of the section it came from; invented URLs are removed
+
+Every repair is driven by the located findings ``validate_text`` already
+produced, so neither text is parsed or aligned again; all edits are made
+against the compressed text as validated and applied in one go. Whatever is
+still wrong afterwards is left to the model fix.
+"""
+
+from bisect import bisect_left
+from difflib import SequenceMatcher
+from typing import List, Optional, Tuple
+
+from .validate import URL_REGEX, MarkdownStructure, ValidationResult
+
+# A lost URL and an added one at least this similar are taken to be the same link, mangled.
+URL_SIMILARITY = 0.6
+
+Edit = Tuple[int, int, str, int]  # (start, end, replacement, tie-break order)
+
+
+def _apply(text: str, edits: List[Edit]) -> str:
+    """Apply non-overlapping edits; insertions at one point keep their order.
+
+    An insertion at the start of a replaced range lands before the replacement.
+    """
+    for start, end, replacement, _ in sorted(edits, key=lambda e: (e[0], e[1] > e[0], e[3]), reverse=True):
+        text = text[:start] + replacement + text[end:]
+    return text
+
+
+def _claimed(edits: List[Edit], start: int, end: int) -> Optional[Edit]:
+    """The edit already replacing text that ``[start, end)`` (or the point ``start``) falls inside."""
+    for edit in edits:
+        if edit[0] < edit[1] and edit[0] < end and start < edit[1]:
+            return edit
+    return None
+
+
+def _paragraph(text: str, point: int, block: str) -> str:
+    """Text to insert at ``point`` so ``block`` stands as its own paragraph."""
+    before = 0
+    while before < 2 and point - before > 0 and text[point - before - 1] == "\n":
+        before += 1
+    after = 0
+    while after < 2 and point + after < len(text) and text[point + after] == "\n":
+        after += 1
+    lead = "\n" * (2 - before) if point > 0 else ""
+    trail = "\n" * (2 - after) if point < len(text) else "\n"
+    return lead + block + trail
+
+
+def _line_end(text: str, start: int) -> int:
+    """Offset just past the line starting at ``start``, newline included."""
+    nl = text.find("\n", start)
+    return len(text) if nl < 0 else nl + 1
+
+
+def _section_end(orig: MarkdownStructure, comp: MarkdownStructure, offset: int) -> int:
+    """End, in the compressed text, of the section holding original ``offset``.
+
+    The section is identified by its heading; if that heading is missing from
+    the compressed text the end of the file is used.
+    """
+    owner = None
+    for i, start in enumerate(orig.heading_offsets):
+        if start > offset:
+            break
+        owner = i
+    if owner is None:  # preamble: everything before the first heading
+        return comp.heading_offsets[0] if comp.heading_offsets else len(comp.text)
+    nth = orig.headings[:owner].count(orig.headings[owner])
+    seen = 0
+    for j, heading in enumerate(comp.headings):
+        if heading != orig.headings[owner]:
+            continue
+        if seen == nth:
+            return comp.heading_offsets[j + 1] if j + 1 < len(comp.headings) else len(comp.text)
+        seen += 1
+    return len(comp.text)
+
+
+def _insertion_point(edits: List[Edit], point: int) -> int:
+    """``point``, moved past any replaced range it would land inside."""
+    edit = _claimed(edits, point, point)
+    return point if edit is None else edit[1]
+
+
+def _repair_code_blocks(result: ValidationResult, edits: List[Edit]) -> List[str]:
+    orig, comp = result.orig, result.comp
+    text = comp.text
+    replaced = lost = dropped = 0
+    for f in result.findings_of("code_block_changed", "code_block_lost", "code_block_added"):
+        if f.kind == "code_block_changed":
+            edits.append((f.comp_span[0], f.comp_span[1], f.expected, 0))
+            replaced += 1
+        elif f.kind == "code_block_added":
+            start, end = f.comp_span
+            edits.append((start, _line_end(text, end) if end < len(text) else end, "", 0))
+            dropped += 1
+        else:
+            # Re-insert a lost block in its original section, but never past
+            # the neighbouring blocks, so the block order stays intact (and
+            # never inside the line range of a block replaced or removed).
+            hi = f.comp_span[0]
+            before = bisect_left(comp.code_block_offsets, hi)
+            lo = _line_end(text, comp.code_block_span(before - 1)[1]) if before else 0
+            point = min(max(_section_end(orig, comp, f.orig_span[0]), lo), hi)
+            edits.append((point, point, _paragraph(text, point, f.expected), f.orig_span[0]))
+            lost += 1
+
+    actions = []
+    if replaced:
+        actions.append(f"restored {replaced} code block(s)")
+    if lost:
+        actions.append(f"re-inserted {lost} lost code block(s)")
+    if dropped:
+        actions.append(f"removed {dropped} invented code block(s)")
+    return actions
+
+
+def _repair_headings(result: ValidationResult, edits: List[Edit]) -> List[str]:
+    orig, comp = result.orig, result.comp
+    text = comp.text
+    # Headings inside a fence come back with the block itself.
+    restored_blocks = [f.orig_span for f in result.findings_of("code_block_changed", "code_block_lost")]
+
+    def in_restored_block(span) -> bool:
+        return any(start <= span[0] and span[1] <= end for start, end in restored_blocks)
+
+    restored = lost = dropped = 0
+    for f in result.findings_of("heading_changed", "heading_lost", "heading_added"):
+        if f.orig_span is not None and in_restored_block(f.orig_span):
+            continue
+        if _claimed(edits, *f.comp_span):
+            continue
+        if f.kind == "heading_changed":
+            edits.append((f.comp_span[0], f.comp_span[1], orig.text[slice(*f.orig_span)].rstrip("\r"), 0))
+            restored += 1
+        elif f.kind == "heading_added":
+            start = f.comp_span[0]
+            edits.append((start, _line_end(text, start), "", 0))
+            dropped += 1
+        else:
+            point = f.comp_span[0]
+            line = orig.text[slice(*f.orig_span)].rstrip("\r")
+            edits.append((point, point, _paragraph(text, point, line), f.orig_span[0]))
+            lost += 1
+
+    actions = []
+    if restored:
+        actions.append(f"restored {restored} heading(s)")
+    if lost:
+        actions.append(f"re-inserted {lost} lost heading(s)")
+    if dropped:
+        actions.append(f"removed {dropped} invented heading(s)")
+    return actions
+
+
+def _best_match(url: str, candidates: List[str]) -> Optional[str]:
+    best, best_ratio = None, URL_SIMILARITY
+    for candidate in candidates:
+        if candidate.startswith(url) or url.startswith(candidate):
+            return candidate
+        ratio = SequenceMatcher(None, url, candidate).ratio()
+        if ratio >= best_ratio:
+            best, best_ratio = candidate, ratio
+    return best
+
+
+def _repair_urls(result: ValidationResult, edits: List[Edit]) -> List[str]:
+    lost_findings = result.findings_of("url_lost")
+    added = {f.actual for f in result.findings_of("url_added")}
+    if not lost_findings and not added:
+        return []
+    orig, comp = result.orig, result.comp
+    text = comp.text
+
+    # URLs inside restored code blocks and heading lines come back with them,
+    # and invented ones inside replaced ranges go away with them.
+    restored = set()
+    for edit in edits:
+        restored.update(URL_REGEX.findall(edit[2]))
+    lost_findings = [f for f in lost_findings if f.expected not in restored]
+    hits = [m for m in URL_REGEX.finditer(text) if m.group(0) in added and not _claimed(edits, m.start(), m.end())]
+    added = sorted({m.group(0) for m in hits})
+
+    # Pair each lost URL with the invented URL that looks most like it.
+    replacements = {}
+    unpaired = []
+    for f in lost_findings:
+        match = _best_match(f.expected, [a for a in added if a not in replacements])
+        if match is None:
+            unpaired.append(f)
+        else:
+            replacements[match] = f.expected
+    invented = [a for a in added if a not in replacements]
+
+    for m in hits:
+        edits.append((m.start(), m.end(), replacements.get(m.group(0), ""), 0))
+    for f in unpaired:
+        point = _insertion_point(edits, _section_end(orig, comp, f.orig_span[0]))
+        edits.append((point, point, _paragraph(text, point, f.expected), f.orig_span[0]))
+
+    actions = []
+    if replacements:
+        actions.append(f"restored {len(replacements)} mangled URL(s)")
+    if unpaired:
+        actions.append(f"re-added {len(unpaired)} lost URL(s)")
+    if invented:
+        actions.append(f"removed {len(invented)} invented URL(s)")
+    return actions
+
+
+# Code blocks go first: headings and URLs inside a restored block need no repair of their own.
+REPAIRS = (_repair_code_blocks, _repair_headings, _repair_urls)
+
+
+def repair(result: ValidationResult) -> Tuple[str, List[str]]:
+    """Fix code blocks, headings and URLs in the compressed text ``result`` validated.
+
+    Returns the repaired text and a description of each action taken (empty
+    when nothing was touched).
+    """
+    edits: List[Edit] = []
+    actions: List[str] = []
+    for step in REPAIRS:
+        actions.extend(step(result, edits))
+    return _apply(result.comp.text, edits), actions
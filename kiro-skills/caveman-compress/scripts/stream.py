@@ -0,0 +1,119 @@
+#!/usr/bin/env python3
+"""Watch a streamed model response and abort as soon as it is clearly bad.
+
+``StreamGuard.feed`` receives text as it arrives, spools it to a temporary
+file and raises ``StreamAborted`` when the response is a refusal, an echo of
+the prompt or input, or is growing past the size of the input. Aborting early
+saves both the wait and the output tokens of a generation that would be thrown
+away anyway.
+"""
+
+import tempfile
+from typing import Optional
+
+# Lowercased openings that mean the model declined instead of compressing.
+REFUSAL_PREFIXES = (
+    "i can't", "i cannot", "i can not", "i won't", "i will not",
+    "i'm sorry", "i am sorry", "sorry,", "i'm unable", "i am unable",
+    "i apologize", "as an ai",
+)
+
+# Openings of our own prompts; a response starting with one is an echo.
+PROMPT_MARKERS = (
+    "compress this markdown into caveman format",
+    "you are fixing a caveman-compressed markdown file",
+    "strict rules:",
+)
+
+SNIFF_CHARS = 80  # enough to recognise a refusal or prompt echo
+ECHO_CHARS = 4000  # identical-to-input prefix this long is not compression
+GROWTH_RATIO = 1.1  # output may not exceed the input by more than this...
+GROWTH_SLACK = 256  # ...plus a little slack for short inputs
+
+
+class StreamAborted(RuntimeError):
+    """Raised from ``StreamGuard.feed`` when a response is abandoned early."""
+
+
+class StreamGuard:
+    """Accumulate a streamed response, failing fast on obvious bad output.
+
+    ``reference`` is the text being compressed (or the original, for fix
+    calls) and bounds the response size. ``detect_echo`` additionally aborts
+    when the response starts by repeating ``reference`` verbatim; it only makes
+    sense for compression calls, where a long unchanged prefix means nothing
+    was compressed. Inputs shorter than ``ECHO_CHARS`` are left to the
+    identical-output check after the call — a short, already terse chunk can
+    legitimately come back unchanged. A refusal or prompt opening is ignored
+    when ``reference`` itself starts with it, since the response is then
+    just keeping the input's first words.
+    """
+
+    def __init__(self, reference: Optional[str] = None, detect_echo: bool = False):
+        self.reference = reference.strip() if reference else None
+        self._reference_head = self.reference[:SNIFF_CHARS].lower() if self.reference else ""
+        self._echo_enabled = detect_echo and self.reference is not None and len(self.reference) > ECHO_CHARS
+        if self.reference:
+            self.limit = int(len(self.reference) * GROWTH_RATIO) + GROWTH_SLACK
+        else:
+            self.limit = None
+        self._spool = tempfile.TemporaryFile("w+", encoding="utf-8")
+        self.reset()
+
+    def reset(self):
+        """Discard everything received so far, e.g. before retrying a request."""
+        self._spool.seek(0)
+        self._spool.truncate()
+        self.length = 0
+        self.detect_echo = self._echo_enabled
+        self._head = ""
+        self._sniffed = False
+
+    def feed(self, chunk: str):
+        if not chunk:
+            return
+        self._spool.write(chunk)
+        self.length += len(chunk)
+        if len(self._head) < ECHO_CHARS:
+            self._head += chunk[: ECHO_CHARS - len(self._head)]
+
+        if not self._sniffed and len(self._head.lstrip()) >= SNIFF_CHARS:
+            self._sniff()
+        if self.limit is not None and self.length > self.limit:
+            raise StreamAborted(
+                f"response grew past the input size ({self.length} > {self.limit} chars)"
+            )
+        if self.detect_echo:
+            self._check_echo()
+
+    def _opens_with(self, head: str, markers) -> bool:
+        """``head`` starts with one of ``markers`` that the reference does not start with."""
+        return any(head.startswith(m) and not self._reference_head.startswith(m) for m in markers)
+
+    def _sniff(self):
+        self._sniffed = True
+        head = self._head.lstrip().lower()
+        if self._opens_with(head, REFUSAL_PREFIXES):
+            raise StreamAborted("model refused: " + self._head.strip().splitlines()[0][:120])
+        if self._opens_with(head, PROMPT_MARKERS):
+            raise StreamAborted("model echoed the prompt")
+
+    def _check_echo(self):
+        head = self._head.lstrip()
+        if len(head) < ECHO_CHARS:
+            return
+        if head[:ECHO_CHARS] == self.reference[:ECHO_CHARS]:
+            raise StreamAborted("model is repeating the input verbatim")
+        self.detect_echo = False  # diverged from the input; stop checking
+
+    def finish(self) -> str:
+        """Run the checks a short response never reached and return the full text."""
+        if not self._sniffed and self._head.strip():
+            self._sniff()
+        self._spool.seek(0)
+        text = self._spool.read()
+        self._spool.close()
+        return text
+
+    def close(self):
+        self._spool.close()
@@ -0,0 +1,315 @@
+#!/usr/bin/env python3
+"""Per-run compression metrics, written as JSON lines.
+
+Every ``compress_file`` call records one line: wall time per phase (detect,
+read, compress, validate, repair, fix, write), model calls, retries, input and
+output tokens from the API's usage field, and bytes before/after. Lines go to
+``$CAVEMAN_TELEMETRY``: a file path, ``-`` for stderr, or ``off``; by default
+``telemetry.jsonl`` in the cache directory. Nothing leaves the machine.
+
+The current run lives in a context variable so model calls made deep inside
+chunk and fix thread pools are attributed to it; ``propagate`` carries it into
+pool workers.
+"""
+
+import contextvars
+import json
+import os
+import sys
+import threading
+import time
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Iterator, Optional
+
+from .cache import cache_dir
+
+DISABLED_VALUES = ("", "0", "off", "false", "no")
+
+_current: contextvars.ContextVar = contextvars.ContextVar("caveman_run", default=None)
+_sink_lock = threading.Lock()
+
+
+def sink_path() -> Optional[Path]:
+    """Where run lines go: a path, ``Path("-")`` for stderr, or None when disabled."""
+    value = os.environ.get("CAVEMAN_TELEMETRY")
+    if value is None:
+        return cache_dir() / "telemetry.jsonl"
+    if value.strip().lower() in DISABLED_VALUES:
+        return None
+    return Path(value).expanduser()
+
+
+class RunMetrics:
+    """Counters for one compression run; thread-safe, since chunks run concurrently."""
+
+    def __init__(self, path: Path, backend: str, model: str):
+        self.path = str(path)
+        self.backend = backend
+        self.model = model
+        self.started = time.time()
+        self.status = None
+        self.error = None
+        self.cache_hit = False
+        self.bytes_before = None
+        self.bytes_after = None
+        self.phases = {}
+        self.calls = 0
+        self.retries = 0
+        self.tokens_in = 0
+        self.tokens_out = 0
+        self._lock = threading.Lock()
+
+    @contextmanager
+    def phase(self, name: str) -> Iterator[None]:
+        """Add the time spent in the block to phase ``name``."""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            elapsed = time.perf_counter() - start
+            with self._lock:
+                self.phases[name] = self.phases.get(name, 0.0) + elapsed
+
+    def add_call(self, tokens_in: Optional[int] = None, tokens_out: Optional[int] = None):
+        with self._lock:
+            self.calls += 1
+            self.tokens_in += tokens_in or 0
+            self.tokens_out += tokens_out or 0
+
+    def add_retry(self):
+        with self._lock:
+            self.retries += 1
+
+    def as_dict(self) -> dict:
+        return {
+            "ts": time.strftime("%Y-%m-%dT%H:%M:%S", time.localtime(self.started)),
+            "file": self.path,
+            "backend": self.backend,
+            "model": self.model,
+            "status": self.status,
+            "error": self.error,
+            "cache_hit": self.cache_hit,
+            "wall_s": round(time.time() - self.started, 4),
+            "phases_s": {k: round(v, 4) for k, v in self.phases.items()},
+            "calls": self.calls,
+            "retries": self.retries,
+            "tokens_in": self.tokens_in,
+            "tokens_out": self.tokens_out,
+            "bytes_before": self.bytes_before,
+            "bytes_after": self.bytes_after,
+        }
+
+
+def current() -> Optional[RunMetrics]:
+    return _current.get()
+
+
+@contextmanager
+def phase(name: str) -> Iterator[None]:
+    """Time a phase of the current run; a no-op outside a run."""
+    run = _current.get()
+    if run is None:
+        yield
+        return
+    with run.phase(name):
+        yield
+
+
+def record_call(tokens_in: Optional[int] = None, tokens_out: Optional[int] = None):
+    run = _current.get()
+    if run is not None:
+        run.add_call(tokens_in, tokens_out)
+
+
+def record_retry():
+    run = _current.get()
+    if run is not None:
+        run.add_retry()
+
+
+def note(**fields):
+    """Set fields (``status``, ``cache_hit``, ``bytes_before``...) on the current run, if any."""
+    run = _current.get()
+    if run is not None:
+        for name, value in fields.items():
+            setattr(run, name, value)
+
+
+def propagate(fn):
+    """Wrap ``fn`` so it runs inside the caller's current run, e.g. in a thread pool."""
+    run = _current.get()
+
+    def wrapper(*args, **kwargs):
+        token = _current.set(run)
+        try:
+            return fn(*args, **kwargs)
+        finally:
+            _current.reset(token)
+
+    return wrapper
+
+
+def emit(record: dict):
+    path = sink_path()
+    if path is None:
+        return
+    line = json.dumps(record, ensure_ascii=False) + "\n"
+    with _sink_lock:
+        if str(path) == "-":
+            sys.stderr.write(line)
+            return
+        try:
+            path.parent.mkdir(parents=True, exist_ok=True)
+            with open(path, "a", encoding="utf-8") as f:
+                f.write(line)
+        except OSError:
+            pass  # metrics must never break a compression
+
+
+@contextmanager
+def track_run(path: Path, backend: str, model: str) -> Iterator[RunMetrics]:
+    """Make a ``RunMetrics`` current for the block and emit it when the block ends."""
+    run = RunMetrics(path, backend, model)
+    token = _current.set(run)
+    try:
+        yield run
+    except BaseException as e:
+        run.status = "error"
+        run.error = f"{type(e).__name__}: {e}"[:500]
+        raise
+    finally:
+        _current.reset(token)
+        emit(run.as_dict())
+
+
+# ---------- Stats ----------
+
+GROUP_KEYS = ("model", "backend", "status", "day", "file")
+PHASES = ("detect", "read", "compress", "validate", "repair", "fix", "write")
+
+
+def load_runs(path: Path, since: Optional[float] = None) -> list:
+    """Parse a telemetry file, skipping malformed lines and runs before ``since`` (epoch seconds)."""
+    runs = []
+    try:
+        f = open(path, encoding="utf-8")
+    except OSError:
+        return runs
+    with f:
+        for line in f:
+            try:
+                run = json.loads(line)
+            except ValueError:
+                continue
+            if not isinstance(run, dict):
+                continue
+            if since is not None:
+                try:
+                    if time.mktime(time.strptime(run.get("ts", ""), "%Y-%m-%dT%H:%M:%S")) < since:
+                        continue
+                except (ValueError, OverflowError):
+                    continue
+            runs.append(run)
+    return runs
+
+
+def _percentile(values: list, q: float) -> float:
+    if not values:
+        return 0.0
+    values = sorted(values)
+    return values[min(len(values) - 1, int(round(q * (len(values) - 1))))]
+
+
+def aggregate(runs: list, by: str = "model") -> dict:
+    """Summaries keyed by the ``by`` field (``day`` groups on the date part of ``ts``)."""
+    groups = {}
+    for run in runs:
+        key = run.get("ts", "")[:10] if by == "day" else run.get(by)
+        groups.setdefault(str(key), []).append(run)
+
+    out = {}
+    for key, items in sorted(groups.items()):
+        statuses = {}
+        for r in items:
+            statuses[r.get("status")] = statuses.get(r.get("status"), 0) + 1
+        written = [r for r in items if r.get("status") == "compressed" and r.get("bytes_before") and r.get("bytes_after")]
+        before = sum(r["bytes_before"] for r in written)
+        after = sum(r["bytes_after"] for r in written)
+        calls = sum(r.get("calls", 0) for r in items)
+        retries = sum(r.get("retries", 0) for r in items)
+        walls = [r.get("wall_s", 0.0) for r in items]
+        out[key] = {
+            "runs": len(items),
+            "statuses": statuses,
+            "cache_hit_pct": round(100 * sum(bool(r.get("cache_hit")) for r in items) / len(items), 1),
+            "bytes_before": before,
+            "bytes_after": after,
+            "saved_pct": round(100 * (before - after) / before, 1) if before else 0.0,
+            "tokens_in": sum(r.get("tokens_in", 0) for r in items),
+            "tokens_out": sum(r.get("tokens_out", 0) for r in items),
+            "calls": calls,
+            "retries": retries,
+            "retry_rate_pct": round(100 * retries / calls, 1) if calls else 0.0,
+            "wall_p50_s": round(_percentile(walls, 0.5), 3),
+            "wall_p95_s": round(_percentile(walls, 0.95), 3),
+            "phase_mean_s": {
+                p: round(sum(r.get("phases_s", {}).get(p, 0.0) for r in items) / len(items), 3)
+                for p in PHASES
+                if any(p in r.get("phases_s", {}) for r in items)
+            },
+        }
+    return out
+
+
+def _parse_since(value: str) -> float:
+    """``7d``, ``12h`` or ``30m`` ago, or an ISO date, as epoch seconds."""
+    units = {"d": 86400, "h": 3600, "m": 60}
+    if value[-1:] in units and value[:-1].isdigit():
+        return time.time() - int(value[:-1]) * units[value[-1]]
+    return time.mktime(time.strptime(value[:10], "%Y-%m-%d"))
+
+
+def print_stats(stats: dict, by: str):
+    if not stats:
+        print("No runs recorded.")
+        return
+    for key, s in stats.items():
+        statuses = ", ".join(f"{k}={v}" for k, v in sorted(s["statuses"].items(), key=lambda kv: str(kv[0])))
+        print(f"\n{by}: {key}")
+        print(f"  Runs:       {s['runs']} ({statuses}), cache hits {s['cache_hit_pct']:.1f}%")
+        print(f"  Bytes:      {s['bytes_before']} → {s['bytes_after']} (saved {s['saved_pct']:.1f}%)")
+        print(f"  Tokens:     {s['tokens_in']} in / {s['tokens_out']} out over {s['calls']} call(s)")
+        print(f"  Retries:    {s['retries']} ({s['retry_rate_pct']:.1f}% of calls)")
+        print(f"  Wall time:  p50 {s['wall_p50_s']:.2f}s, p95 {s['wall_p95_s']:.2f}s")
+        if s["phase_mean_s"]:
+            phases = ", ".join(f"{p} {t:.2f}s" for p, t in s["phase_mean_s"].items())
+            print(f"  Mean phase: {phases}")
+
+
+def stats_main(argv: list) -> int:
+    import argparse
+
+    parser = argparse.ArgumentParser(prog="caveman stats", description="Aggregate recorded compression runs.")
+    parser.add_argument("--file", type=Path, default=None, help="telemetry file (default: $CAVEMAN_TELEMETRY or cache dir)")
+    parser.add_argument("--by", choices=GROUP_KEYS, default="model", help="group runs by this field (default: model)")
+    parser.add_argument("--since", help="only runs newer than 7d / 12h / 30m or YYYY-MM-DD")
+    parser.add_argument("--json", action="store_true", help="print the aggregate as JSON")
+    args = parser.parse_args(argv)
+
+    path = args.file or sink_path()
+    if path is None or str(path) == "-":
+        print("❌ Telemetry is not being written to a file (CAVEMAN_TELEMETRY); pass --file")
+        return 1
+    try:
+        since = _parse_since(args.since) if args.since else None
+    except ValueError:
+        print(f"❌ Cannot parse --since {args.since!r}")
+        return 1
+
+    stats = aggregate(load_runs(path, since), args.by)
+    if args.json:
+        print(json.dumps(stats, indent=2, ensure_ascii=False))
+    else:
+        print_stats(stats, args.by)
+    return 0
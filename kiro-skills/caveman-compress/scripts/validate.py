@@ -1,6 +1,7 @@
 #!/usr/bin/env python3
 import re
 from collections import Counter
+from difflib import SequenceMatcher
 from pathlib import Path
 
 URL_REGEX = re.compile(r"https?://[^\s)]+")
@@ -12,12 +13,56 @@ BULLET_REGEX = re.compile(r"^\s*[-*+]\s+", re.MULTILINE)
 # Requires either a path prefix (./ ../ / or drive letter) or a slash/backslash within the match
 PATH_REGEX = re.compile(r"(?:\./|\.\./|/|[A-Za-z]:\\)[\w\-/\\\.]+|[\w\-\.]+[/\\][\w\-/\\\.]+")
 
+# Every PATH_REGEX match contains a slash and sits inside one run of these
+# characters, so the regex only needs to run over runs around a slash.
+PATH_RUN_CHARS = frozenset("_-/\\.:")
+PATH_RUN_END_REGEX = re.compile(r"[\w\-/\\.:]*")
+SLASH_REGEX = re.compile(r"[/\\]")
+
+INLINE_CODE_REGEX = re.compile(r"`([^`]+)`")
+
+
+class Finding:
+    """One located difference between original and compressed text.
+
+    ``kind`` names the check (e.g. ``code_block_changed``, ``url_lost``),
+    ``severity`` is ``"error"`` or ``"warning"``. Spans are ``(start, end)``
+    character offsets and lines are 1-based ``(first, last)`` line numbers,
+    each ``None`` when the item does not exist on that side. A lost heading
+    or code block instead gets the empty ``comp_span`` where it is missing
+    (the start of the next compressed item, or the end of the text).
+    ``expected`` is the original item and ``actual`` what the compressed text
+    has instead.
+    """
+
+    __slots__ = ("kind", "severity", "orig_span", "comp_span", "orig_lines", "comp_lines", "expected", "actual")
+
+    def __init__(self, kind, severity, orig_span=None, comp_span=None, expected=None, actual=None):
+        self.kind = kind
+        self.severity = severity
+        self.orig_span = orig_span
+        self.comp_span = comp_span
+        self.orig_lines = None
+        self.comp_lines = None
+        self.expected = expected
+        self.actual = actual
+
+    def __repr__(self):
+        return (
+            f"Finding({self.kind!r}, {self.severity!r}, orig_lines={self.orig_lines}, "
+            f"comp_lines={self.comp_lines}, expected={self.expected!r}, actual={self.actual!r})"
+        )
+
 
 class ValidationResult:
     def __init__(self):
         self.is_valid = True
         self.errors = []
         self.warnings = []
+        self.findings = []
+        # Parsed MarkdownStructure of each side; finding spans index into their text.
+        self.orig = None
+        self.comp = None
 
     def add_error(self, msg):
         self.is_valid = False
@@ -26,6 +71,12 @@ class ValidationResult:
     def add_warning(self, msg):
         self.warnings.append(msg)
 
+    def add_finding(self, finding):
+        self.findings.append(finding)
+
+    def findings_of(self, *kinds):
+        return [f for f in self.findings if f.kind in kinds]
+
 
 def read_file(path: Path) -> str:
     return path.read_text(errors="ignore")
@@ -86,8 +137,29 @@ def extract_urls(text):
     return set(URL_REGEX.findall(text))
 
 
+def find_paths(text):
+    """``PATH_REGEX.findall(text)``, but only scanning the word runs that hold a slash.
+
+    Running PATH_REGEX over the whole text backtracks through every word of
+    prose; restricting it to slash-bearing runs gives identical matches at a
+    fraction of the cost.
+    """
+    paths = []
+    end = 0
+    for m in SLASH_REGEX.finditer(text):
+        pos = m.start()
+        if pos < end:
+            continue  # slash inside the run just scanned
+        start = pos
+        while start > end and (text[start - 1].isalnum() or text[start - 1] in PATH_RUN_CHARS):
+            start -= 1
+        end = PATH_RUN_END_REGEX.match(text, pos).end()
+        paths.extend(PATH_REGEX.findall(text, start, end))
+    return paths
+
+
 def extract_paths(text):
-    return set(PATH_REGEX.findall(text))
+    return set(find_paths(text))
 
 
 def count_bullets(text):
@@ -100,47 +172,229 @@ def extract_inline_codes(text):
     return re.findall(r"`([^`]+)`", text_without_fences)
 
 
+# ---------- Single-pass Structure ----------
+
+
+class MarkdownStructure:
+    """Everything the validators compare, gathered in one walk over a text.
+
+    Headings, fenced code blocks, bullets and the prose spans searched for
+    inline code come from a single line loop (cheap first-character checks
+    decide which regex, if any, a line needs); URLs and paths are one scan each.
+    """
+
+    __slots__ = (
+        "text", "headings", "heading_offsets", "code_blocks", "code_block_offsets",
+        "inline_codes", "urls", "paths", "bullets",
+    )
+
+    def __init__(
+        self, headings, code_blocks, inline_codes, urls, paths, bullets,
+        text="", heading_offsets=None, code_block_offsets=None,
+    ):
+        self.text = text
+        self.headings = headings
+        self.heading_offsets = heading_offsets or []  # start offset of each heading line
+        self.code_blocks = code_blocks
+        self.code_block_offsets = code_block_offsets or []  # start offset of each block
+        self.inline_codes = inline_codes
+        self.urls = urls
+        self.paths = paths
+        self.bullets = bullets
+
+    def heading_span(self, i):
+        start = self.heading_offsets[i]
+        end = self.text.find("\n", start)
+        return (start, len(self.text) if end < 0 else end)
+
+    def code_block_span(self, i):
+        start = self.code_block_offsets[i]
+        return (start, start + len(self.code_blocks[i]))
+
+    def gap_span(self, offsets, index):
+        """Empty span just before item ``index`` of ``offsets`` (end of text past the last)."""
+        point = offsets[index] if index < len(offsets) else len(self.text)
+        return (point, point)
+
+    def find_span(self, needle):
+        """Span of the first occurrence of ``needle``, or None."""
+        start = self.text.find(needle)
+        return None if start < 0 else (start, start + len(needle))
+
+
+def _scan_line(line: str, headings: list, offsets: list, line_start: int) -> int:
+    """Record a heading on ``line``; return 1 if it is a bullet line, else 0."""
+    first = line.lstrip()[:1]
+    if first == "#" and line[:1] == "#":
+        m = HEADING_REGEX.match(line)
+        if m:
+            headings.append((m.group(1), m.group(2).strip()))
+            offsets.append(line_start)
+    elif first in ("-", "*", "+") and first and BULLET_REGEX.match(line):
+        return 1
+    return 0
+
+
+def parse_markdown(text: str) -> MarkdownStructure:
+    headings = []
+    heading_offsets = []
+    blocks = []
+    block_offsets = []
+    bullets = 0
+    inline_codes = []
+
+    # Lines are walked by offset (same boundaries as text.split("\\n")), so
+    # no list of all lines is built; only code block text is copied out.
+    find = text.find
+    n = len(text)
+    pos = 0  # offset of the next line
+    prose_start = 0  # offset where the current run of prose began
+    while pos <= n:
+        line_start = pos
+        nl = find("\n", pos)
+        line_end = n if nl < 0 else nl
+        pos = line_end + 1
+        line = text[line_start:line_end]
+        bullets += _scan_line(line, headings, heading_offsets, line_start)
+
+        if line.lstrip()[:3] not in ("```", "~~~"):
+            continue
+        fence = FENCE_OPEN_REGEX.match(line)
+        if not fence:
+            continue
+
+        # Fenced block: same CommonMark closing rules as extract_code_blocks.
+        # Headings and bullets inside still count, as they always have.
+        fence_char = fence.group(2)[0]
+        fence_len = len(fence.group(2))
+        closed = False
+        while pos <= n:
+            nl = find("\n", pos)
+            inner_end = n if nl < 0 else nl
+            inner = text[pos:inner_end]
+            bullets += _scan_line(inner, headings, heading_offsets, pos)
+            pos = inner_end + 1
+            if inner.lstrip()[:1] == fence_char:
+                close = FENCE_OPEN_REGEX.match(inner)
+                if (
+                    close
+                    and close.group(2)[0] == fence_char
+                    and len(close.group(2)) >= fence_len
+                    and close.group(3).strip() == ""
+                ):
+                    closed = True
+                    break
+        if closed:
+            # Unclosed fences are not blocks and their text stays prose.
+            blocks.append(text[line_start:pos - 1])
+            block_offsets.append(line_start)
+            inline_codes.extend(INLINE_CODE_REGEX.findall(text, prose_start, line_start))
+            prose_start = pos
+
+    # Inline code is only searched in the prose between fenced blocks.
+    inline_codes.extend(INLINE_CODE_REGEX.findall(text, prose_start))
+
+    return MarkdownStructure(
+        headings=headings,
+        code_blocks=blocks,
+        inline_codes=inline_codes,
+        urls=set(URL_REGEX.findall(text)),
+        paths=set(find_paths(text)),
+        bullets=bullets,
+        text=text,
+        heading_offsets=heading_offsets,
+        code_block_offsets=block_offsets,
+    )
+
+
 # ---------- Validators ----------
+#
+# Each validator compares two MarkdownStructure objects from parse_markdown.
+
+
+def _unmatched(a, b):
+    """Yield ``(i, j, at)`` for items of ``a`` and ``b`` that differ.
+
+    Lists are aligned with difflib, so one dropped item does not shift every
+    later item into a mismatch. Either index is None for an item with no
+    counterpart on the other side; ``at`` is the index in ``b`` the item sits
+    at, or for an item missing from ``b`` the index it belongs before.
+    """
+    matcher = SequenceMatcher(None, a, b, autojunk=False)
+    for tag, i1, i2, j1, j2 in matcher.get_opcodes():
+        if tag == "equal":
+            continue
+        for k in range(max(i2 - i1, j2 - j1)):
+            i = i1 + k if i1 + k < i2 else None
+            j = j1 + k if j1 + k < j2 else None
+            yield i, j, j2 if j is None else j
 
 
 def validate_headings(orig, comp, result):
-    h1 = extract_headings(orig)
-    h2 = extract_headings(comp)
+    h1 = orig.headings
+    h2 = comp.headings
 
     if len(h1) != len(h2):
         result.add_error(f"Heading count mismatch: {len(h1)} vs {len(h2)}")
 
     if h1 != h2:
         result.add_warning("Heading text/order changed")
+        severity = "error" if len(h1) != len(h2) else "warning"
+        for i, j, at in _unmatched(h1, h2):
+            kind = "heading_changed" if i is not None and j is not None else "heading_lost" if j is None else "heading_added"
+            result.add_finding(Finding(
+                kind, severity,
+                orig_span=orig.heading_span(i) if i is not None else None,
+                comp_span=comp.heading_span(j) if j is not None else comp.gap_span(comp.heading_offsets, at),
+                expected=h1[i] if i is not None else None,
+                actual=h2[j] if j is not None else None,
+            ))
 
 
 def validate_code_blocks(orig, comp, result):
-    c1 = extract_code_blocks(orig)
-    c2 = extract_code_blocks(comp)
+    c1 = orig.code_blocks
+    c2 = comp.code_blocks
 
     if c1 != c2:
         result.add_error("Code blocks not preserved exactly")
+        for i, j, at in _unmatched(c1, c2):
+            kind = "code_block_changed" if i is not None and j is not None else "code_block_lost" if j is None else "code_block_added"
+            result.add_finding(Finding(
+                kind, "error",
+                orig_span=orig.code_block_span(i) if i is not None else None,
+                comp_span=comp.code_block_span(j) if j is not None else comp.gap_span(comp.code_block_offsets, at),
+                expected=c1[i] if i is not None else None,
+                actual=c2[j] if j is not None else None,
+            ))
 
 
 def validate_urls(orig, comp, result):
-    u1 = extract_urls(orig)
-    u2 = extract_urls(comp)
+    u1 = orig.urls
+    u2 = comp.urls
 
     if u1 != u2:
         result.add_error(f"URL mismatch: lost={u1 - u2}, added={u2 - u1}")
+        for url in sorted(u1 - u2):
+            result.add_finding(Finding("url_lost", "error", orig_span=orig.find_span(url), expected=url))
+        for url in sorted(u2 - u1):
+            result.add_finding(Finding("url_added", "error", comp_span=comp.find_span(url), actual=url))
 
 
 def validate_paths(orig, comp, result):
-    p1 = extract_paths(orig)
-    p2 = extract_paths(comp)
+    p1 = orig.paths
+    p2 = comp.paths
 
     if p1 != p2:
         result.add_warning(f"Path mismatch: lost={p1 - p2}, added={p2 - p1}")
+        for path in sorted(p1 - p2):
+            result.add_finding(Finding("path_lost", "warning", orig_span=orig.find_span(path), expected=path))
+        for path in sorted(p2 - p1):
+            result.add_finding(Finding("path_added", "warning", comp_span=comp.find_span(path), actual=path))
 
 
 def validate_bullets(orig, comp, result):
-    b1 = count_bullets(orig)
-    b2 = count_bullets(comp)
+    b1 = orig.bullets
+    b2 = comp.bullets
 
     if b1 == 0:
         return
@@ -149,32 +403,54 @@ def validate_bullets(orig, comp, result):
 
     if diff > 0.15:
         result.add_warning(f"Bullet count changed too much: {b1} -> {b2}")
+        result.add_finding(Finding("bullet_count", "warning", expected=b1, actual=b2))
 
 
 def validate_inline_codes(orig, comp, result):
-    c1 = Counter(extract_inline_codes(orig))
-    c2 = Counter(extract_inline_codes(comp))
+    c1 = Counter(orig.inline_codes)
+    c2 = Counter(comp.inline_codes)
 
     if c1 != c2:
         lost = set(c1.keys()) - set(c2.keys())
         added = set(c2.keys()) - set(c1.keys())
+        for code in sorted(lost):
+            result.add_finding(Finding(
+                "inline_code_lost", "error", orig_span=orig.find_span(f"`{code}`"), expected=code, actual=0,
+            ))
         for code, count in c1.items():
             if code in c2 and c2[code] < count:
                 lost.add(f"{code} (lost {count - c2[code]} of {count} occurrences)")
+                result.add_finding(Finding(
+                    "inline_code_lost", "error", orig_span=orig.find_span(f"`{code}`"),
+                    comp_span=comp.find_span(f"`{code}`"), expected=code, actual=c2[code],
+                ))
         if lost:
             result.add_error(f"Inline code lost: {lost}")
         if added:
             result.add_warning(f"Inline code added: {added}")
+            for code in sorted(added):
+                result.add_finding(Finding("inline_code_added", "warning", comp_span=comp.find_span(f"`{code}`"), actual=code))
+
+
+def _span_lines(text, span):
+    if span is None:
+        return None
+    first = text.count("\n", 0, span[0]) + 1
+    return (first, first + text.count("\n", span[0], span[1]))
 
 
 # ---------- Main ----------
 
 
 def validate(original_path: Path, compressed_path: Path) -> ValidationResult:
-    result = ValidationResult()
+    return validate_text(read_file(original_path), read_file(compressed_path))
+
 
-    orig = read_file(original_path)
-    comp = read_file(compressed_path)
+def validate_text(orig: str, comp: str) -> ValidationResult:
+    """Validate in-memory original/compressed text without touching disk."""
+    result = ValidationResult()
+    orig = result.orig = parse_markdown(orig)
+    comp = result.comp = parse_markdown(comp)
 
     validate_headings(orig, comp, result)
     validate_code_blocks(orig, comp, result)
@@ -183,6 +459,10 @@ def validate(original_path: Path, compressed_path: Path) -> ValidationResult:
     validate_bullets(orig, comp, result)
     validate_inline_codes(orig, comp, result)
 
+    for finding in result.findings:
+        finding.orig_lines = _span_lines(orig.text, finding.orig_span)
+        finding.comp_lines = _span_lines(comp.text, finding.comp_span)
+
     return result
 
 
@@ -211,3 +491,13 @@ if __name__ == "__main__":
         print("\nWarnings:")
         for w in res.warnings:
             print(f"  - {w}")
+
+    if res.findings:
+        print("\nFindings:")
+        for f in res.findings:
+            where = ", ".join(
+                f"{side} lines {lines[0]}-{lines[1]}"
+                for side, lines in (("original", f.orig_lines), ("compressed", f.comp_lines))
+                if lines
+            )
+            print(f"  - [{f.severity}] {f.kind}" + (f" ({where})" if where else ""))
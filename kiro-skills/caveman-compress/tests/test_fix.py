@@ -0,0 +1,62 @@
+"""Section-targeted model fixes (compress._align_regions, compress.fix_compressed)."""
+
+from scripts import compress
+from scripts.chunk import split_sections_with_preamble
+
+ORIGINAL = (
+    "Intro paragraph that is long.\n\n"
+    "# One\n\nFirst section body, really quite wordy.\n\n"
+    "# Two\n\nSecond section, see https://example.com/two for more.\n\n"
+    "# Three\n\nThird section body.\n"
+)
+COMPRESSED = (
+    "Intro.\n\n"
+    "# One\n\nFirst body.\n\n"
+    "# Two\n\nSecond section.\n\n"
+    "# Three\n\nThird body.\n"
+)
+
+
+def regions(orig, comp):
+    return compress._align_regions(split_sections_with_preamble(orig), split_sections_with_preamble(comp))
+
+
+def test_regions_rejoin_to_both_texts():
+    for comp in (COMPRESSED, COMPRESSED.replace("# Two\n\n", ""), COMPRESSED.replace("# Three", "# Extra\n\nx\n\n# Three")):
+        pairs = regions(ORIGINAL, comp)
+        assert "".join(o for o, _ in pairs) == ORIGINAL
+        assert "".join(c for _, c in pairs) == comp
+
+
+def test_lost_heading_folds_into_preceding_region():
+    pairs = regions(ORIGINAL, COMPRESSED.replace("# Two\n\n", ""))
+    assert len(pairs) == 3
+    assert pairs[1][0].startswith("# One") and "# Two" in pairs[1][0]
+
+
+def test_fix_sends_only_the_failing_section(monkeypatch):
+    prompts = []
+
+    def fake_claude(prompt, reference=None, detect_echo=False):
+        prompts.append(prompt)
+        return "# Two\n\nSecond section, see https://example.com/two.\n"
+
+    monkeypatch.setattr(compress, "call_claude", fake_claude)
+    fixed = compress.fix_compressed(ORIGINAL, COMPRESSED, ["URL lost: https://example.com/two"])
+    assert len(prompts) == 1
+    assert "# Two" in prompts[0] and "# One" not in prompts[0] and "# Three" not in prompts[0]
+    assert fixed == COMPRESSED.replace("Second section.", "Second section, see https://example.com/two.")
+
+
+def test_fix_falls_back_to_whole_file(monkeypatch):
+    prompts = []
+
+    def fake_claude(prompt, reference=None, detect_echo=False):
+        prompts.append(prompt)
+        return "whole"
+
+    monkeypatch.setattr(compress, "call_claude", fake_claude)
+    # Every region validates on its own, so no single section explains the failure.
+    valid = COMPRESSED.replace("Second section.", "Second section, see https://example.com/two for more.")
+    assert compress.fix_compressed(ORIGINAL, valid, ["bullet count changed"]) == "whole"
+    assert len(prompts) == 1 and ORIGINAL in prompts[0]
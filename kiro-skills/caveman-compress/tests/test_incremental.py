@@ -0,0 +1,107 @@
+"""Section splitting and incremental splicing (scripts/chunk.py, compress._splice_changed_sections)."""
+
+import pytest
+
+from scripts import compress
+from scripts.chunk import pack_chunks, split_sections, split_sections_with_preamble
+
+SAMPLES = [
+    "",
+    "no headings at all\n",
+    "# Title\n\nBody.\n\n## Sub\n\nMore body.\n",
+    "Preamble first.\n\n# A\n\ntext\n",
+    "# A\n\n```md\n# not a section\n```\n\n# B\n",
+    "# A\r\n\r\ncrlf body\r\n# B\r\n",
+    "# A\n\nno trailing newline",
+    "~~~\n# fenced\n~~~\n# Real\n",
+]
+
+ORIGINAL = (
+    "Intro that is really very long.\n\n"
+    "# Setup\n\nYou really need to install the thing.\n\n"
+    "## Usage\n\nJust basically run it and it really works.\n\n"
+    "```bash\n# comment, not a heading\nrun --now\n```\n\n"
+    "## Notes\n\nSome really final notes.\n"
+)
+
+
+def fake_compress(chunk: str) -> str:
+    return chunk.replace("really ", "").replace("basically ", "")
+
+
+@pytest.mark.parametrize("text", SAMPLES)
+def test_split_sections_is_lossless(text):
+    assert "".join(split_sections(text)) == text
+    assert "".join(split_sections_with_preamble(text)) == text
+
+
+@pytest.mark.parametrize("text", SAMPLES)
+def test_pack_chunks_is_lossless(text):
+    for limit in (1, 10, 10_000):
+        assert "".join(pack_chunks(split_sections(text), limit)) == text
+
+
+def test_headings_inside_fences_do_not_split():
+    sections = split_sections(ORIGINAL)
+    assert [s.split("\n", 1)[0] for s in sections] == ["Intro that is really very long.", "# Setup", "## Usage", "## Notes"]
+
+
+@pytest.fixture
+def spliced(tmp_path, monkeypatch):
+    """Record a compression of ORIGINAL, then splice an edited original with a fake compressor."""
+    monkeypatch.setenv("CAVEMAN_CACHE_DIR", str(tmp_path / "cache"))
+    filepath = tmp_path / "doc.md"
+    compressed = "".join(fake_compress(s) for s in split_sections_with_preamble(ORIGINAL))
+    compress._save_section_manifest(filepath, ORIGINAL, compressed)
+
+    calls = []
+
+    def record(chunk):
+        calls.append(chunk)
+        return fake_compress(chunk)
+
+    monkeypatch.setattr(compress, "_compress_chunk", record)
+
+    def run(edited, current=compressed):
+        return compress._splice_changed_sections(filepath, edited, current, chunked=None)
+
+    return run, compressed, calls
+
+
+def test_unchanged_original_returns_compressed_text(spliced):
+    run, compressed, calls = spliced
+    assert run(ORIGINAL) is compressed
+    assert calls == []
+
+
+def test_only_edited_section_is_recompressed(spliced):
+    run, compressed, calls = spliced
+    edited = ORIGINAL.replace("Just basically run it", "Just basically run it twice")
+    result = run(edited)
+    assert len(calls) == 1 and calls[0].startswith("## Usage")
+    assert result == "".join(fake_compress(s) for s in split_sections_with_preamble(edited))
+    # Untouched sections are byte-for-byte the old compressed text.
+    assert result.startswith(compressed[: compressed.index("## Usage")])
+    assert result.endswith(compressed[compressed.index("## Notes"):])
+
+
+def test_added_and_removed_sections(spliced):
+    run, _, calls = spliced
+    edited = ORIGINAL.replace("## Notes\n\nSome really final notes.\n", "## Extra\n\nReally new.\n")
+    result = run(edited)
+    assert [c.split("\n", 1)[0] for c in calls] == ["## Extra"]
+    assert "## Notes" not in result and result.endswith("## Extra\n\nReally new.\n")
+
+
+def test_missing_manifest_recompresses_whole_file(tmp_path, monkeypatch):
+    monkeypatch.setenv("CAVEMAN_CACHE_DIR", str(tmp_path / "cache"))
+    monkeypatch.setattr(compress, "_compress_text", lambda text, chunked: "whole:" + text)
+    result = compress._splice_changed_sections(tmp_path / "doc.md", ORIGINAL, fake_compress(ORIGINAL), chunked=None)
+    assert result == "whole:" + ORIGINAL
+
+
+def test_hand_edited_compressed_file_invalidates_manifest(spliced, monkeypatch):
+    run, compressed, calls = spliced
+    monkeypatch.setattr(compress, "_compress_text", lambda text, chunked: "whole:" + text)
+    assert run(ORIGINAL, compressed + "hand edit\n") == "whole:" + ORIGINAL
+    assert calls == []
@@ -0,0 +1,73 @@
+"""Round-trip tests for masking protected spans (scripts/mask.py)."""
+
+import random
+
+import pytest
+
+from scripts.mask import PLACEHOLDER_REGEX, mask_protected, unmask
+
+SAMPLES = [
+    "",
+    "Plain prose with nothing to protect.\n",
+    "Run `make test` then see https://example.com/docs for more.\n\n```bash\nrm -rf build\n```\n",
+    "Intro\n\n~~~~\n```\ninner\n```\n~~~~\n\nText `a` and `b`\n",
+    "    ```\nindented four spaces is not a fence\n    ```\n",
+    "unclosed:\n```\nnever closed https://x.io/y\n",
+    "CRLF line\r\n```py\r\nx = 1\r\n```\r\nafter http://a.b/c?d=e\r\n",
+    "```\nno trailing newline\n```",
+    "`one``two` ``double`` and a lone ` backtick\n",
+]
+
+
+def _random_doc(rng: random.Random) -> str:
+    pieces = []
+    for _ in range(rng.randint(1, 12)):
+        kind = rng.random()
+        if kind < 0.2:
+            fence = rng.choice(["```", "~~~", "````"])
+            pieces.append(f"{fence}{rng.choice(['', 'py', 'bash'])}\ncode {rng.randint(0, 99)} `tick` https://in.block/x\n{fence}\n")
+        elif kind < 0.4:
+            pieces.append(f"Use `cmd --flag {rng.randint(0, 9)}` here.\n")
+        elif kind < 0.6:
+            pieces.append(f"Link https://example.com/p/{rng.randint(0, 99)} and (http://b.org/q).\n")
+        elif kind < 0.7:
+            pieces.append(f"## Heading {rng.randint(0, 9)}\n")
+        else:
+            pieces.append(rng.choice(["Words and words.\n", "\n", "- bullet item\n", "trailing space \n"]))
+    return "".join(pieces)
+
+
+@pytest.mark.parametrize("text", SAMPLES)
+def test_unmask_restores_masked_text(text):
+    masked, spans = mask_protected(text)
+    restored, missing = unmask(masked, spans)
+    assert restored == text
+    assert missing == []
+
+
+def test_round_trip_random_documents():
+    rng = random.Random(1234)
+    for _ in range(300):
+        text = _random_doc(rng)
+        masked, spans = mask_protected(text)
+        assert len(PLACEHOLDER_REGEX.findall(masked)) == len(spans)
+        assert unmask(masked, spans) == (text, [])
+
+
+def test_protected_spans_leave_the_masked_text():
+    text = SAMPLES[2]
+    masked, spans = mask_protected(text)
+    assert masked == "Run ⟦C0⟧ then see ⟦U1⟧ for more.\n\n⟦B2⟧\n"
+    assert spans == ["`make test`", "https://example.com/docs", "```bash\nrm -rf build\n```"]
+
+
+def test_dropped_placeholder_is_reported_missing():
+    masked, spans = mask_protected(SAMPLES[2])
+    restored, missing = unmask(masked.replace("⟦U1⟧", "link"), spans)
+    assert missing == [1]
+    assert "`make test`" in restored and "rm -rf build" in restored
+
+
+def test_text_with_placeholder_brackets_is_not_masked():
+    text = "Literal ⟦B0⟧ and `code` https://example.com\n"
+    assert mask_protected(text) == (text, [])
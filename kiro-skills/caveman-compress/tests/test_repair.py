@@ -0,0 +1,135 @@
+"""Local repair of code blocks, headings and URLs (scripts/repair.py)."""
+
+from scripts.repair import repair
+from scripts.validate import parse_markdown, validate_text
+
+ORIGINAL = """\
+# Install
+
+You should really run the installer first, see https://example.com/install for details.
+
+```bash
+pip install caveman
+```
+
+## Usage
+
+Then basically you can just call the tool on any file you want.
+
+## Links
+
+More at https://example.com/docs and https://example.com/faq.
+"""
+
+COMPRESSED = """\
+# Install
+
+Run installer first, see https://example.com/install for details.
+
+```bash
+pip install caveman
+```
+
+## Usage
+
+Call tool on any file.
+
+## Links
+
+More at https://example.com/docs and https://example.com/faq.
+"""
+
+
+def repaired(comp, orig=ORIGINAL):
+    """Repair ``comp`` against ``orig`` and check the result now validates."""
+    text, actions = repair(validate_text(orig, comp))
+    result = validate_text(orig, text)
+    assert result.is_valid, result.errors
+    return text, actions
+
+
+def section(text, heading):
+    """Body of the section under ``heading``, up to the next heading."""
+    start = text.index(heading)
+    following = [o for o in parse_markdown(text).heading_offsets if o > start]
+    return text[start:following[0] if following else len(text)]
+
+
+def test_valid_compression_is_untouched():
+    assert validate_text(ORIGINAL, COMPRESSED).is_valid
+    assert repair(validate_text(ORIGINAL, COMPRESSED)) == (COMPRESSED, [])
+
+
+def test_lost_url_is_re_added_in_its_section():
+    text, actions = repaired(COMPRESSED.replace(", see https://example.com/install", ""))
+    assert actions == ["re-added 1 lost URL(s)"]
+    assert "https://example.com/install" in section(text, "# Install")
+
+
+def test_mangled_url_is_restored_in_place():
+    text, actions = repaired(COMPRESSED.replace("https://example.com/docs", "https://example.com/doc"))
+    assert actions == ["restored 1 mangled URL(s)"]
+    assert text == COMPRESSED
+
+
+def test_invented_url_is_removed():
+    text, actions = repaired(COMPRESSED.replace("Call tool", "Call tool (https://made.up/x)"))
+    assert actions == ["removed 1 invented URL(s)"]
+    assert "made.up" not in text
+
+
+def test_lost_code_block_is_re_inserted():
+    text, actions = repaired(COMPRESSED.replace("```bash\npip install caveman\n```\n\n", ""))
+    assert actions == ["re-inserted 1 lost code block(s)"]
+    assert "```bash\npip install caveman\n```" in section(text, "# Install")
+
+
+def test_changed_code_block_is_restored():
+    text, actions = repaired(COMPRESSED.replace("pip install caveman", "pip install cavemen"))
+    assert actions == ["restored 1 code block(s)"]
+    assert text == COMPRESSED
+
+
+def test_invented_code_block_is_removed():
+    text, actions = repaired(COMPRESSED.replace("Call tool on any file.\n", "Call tool on any file.\n\n```\ncaveman FILE\n```\n"))
+    assert actions == ["removed 1 invented code block(s)"]
+    assert "caveman FILE" not in text
+
+
+def test_lost_heading_is_re_inserted_before_the_next_one():
+    text, actions = repaired(COMPRESSED.replace("## Usage\n\n", ""))
+    assert actions == ["re-inserted 1 lost heading(s)"]
+    assert text.index("## Usage") < text.index("## Links")
+    assert text.index("pip install caveman") < text.index("## Usage")
+
+
+def test_changed_heading_is_restored():
+    text, actions = repaired(COMPRESSED.replace("## Usage", "## Use"))
+    assert actions == ["restored 1 heading(s)"]
+    assert text == COMPRESSED
+
+
+def test_invented_heading_is_removed():
+    text, actions = repaired(COMPRESSED.replace("Call tool", "### Extra\n\nCall tool"))
+    assert actions == ["removed 1 invented heading(s)"]
+    assert "### Extra" not in text
+
+
+def test_heading_inside_lost_block_comes_back_with_the_block():
+    orig = "# Top\n\nIntro text here.\n\n```md\n# Inner\n```\n\n## Next\n\nMore.\n"
+    text, actions = repaired("# Top\n\nIntro.\n\n## Next\n\nMore.\n", orig)
+    assert actions == ["re-inserted 1 lost code block(s)"]
+    assert text.count("# Inner") == 1
+
+
+def test_several_losses_repaired_together():
+    comp = (
+        COMPRESSED.replace("```bash\npip install caveman\n```\n\n", "")
+        .replace("## Usage", "## Use")
+        .replace("and https://example.com/faq.", "and FAQ.")
+    )
+    text, actions = repaired(comp)
+    assert sorted(actions) == sorted(
+        ["re-inserted 1 lost code block(s)", "restored 1 heading(s)", "re-added 1 lost URL(s)"]
+    )
+    assert "https://example.com/faq" in section(text, "## Links")
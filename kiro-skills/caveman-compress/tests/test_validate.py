@@ -0,0 +1,117 @@
+"""parse_markdown against the per-feature extractors it replaced (scripts/validate.py)."""
+
+import random
+import re
+from collections import Counter
+
+import pytest
+
+from scripts.validate import (
+    PATH_REGEX,
+    count_bullets,
+    extract_code_blocks,
+    extract_headings,
+    extract_inline_codes,
+    extract_urls,
+    find_paths,
+    parse_markdown,
+    validate_text,
+)
+
+# Documents on which the old extractors were already right: fences are
+# unindented and exactly three characters, and no heading line is a bare '#'.
+SAMPLES = [
+    "",
+    "Just prose, no structure.\n",
+    "# Title\n\n## Sub heading ##\n\n- one\n* two\n  + nested\n",
+    "Run `make test` and `pytest -q`, see https://example.com/a?b=c.\n",
+    "```bash\n# comment inside\n- not really a bullet\nrun `x`\n```\nAfter `y` ./scripts/run.sh\n",
+    "~~~\ncode ~~~ here\n~~~\n\n~~~py\nx = 1\n~~~\n",
+    "unclosed\n```\nstill prose `z` src/app.py\n",
+    "Paths: /etc/hosts, ../up/file.txt, C:\\Users\\me, docs/guide.md\n",
+    "CRLF\r\n# Heading\r\n- item\r\n```\r\ncode\r\n```\r\n",
+    "###### Six\n####### Seven is prose\n",
+]
+
+
+def _random_doc(rng: random.Random) -> str:
+    pieces = []
+    for _ in range(rng.randint(1, 15)):
+        kind = rng.random()
+        if kind < 0.15:
+            fence = rng.choice(["```", "~~~"])
+            pieces.append(f"{fence}{rng.choice(['', 'sh'])}\n# inner {rng.randint(0, 9)}\n- x `c`\n{fence}\n")
+        elif kind < 0.3:
+            pieces.append(f"{'#' * rng.randint(1, 7)} Heading {rng.randint(0, 9)}\n")
+        elif kind < 0.45:
+            pieces.append(f"{rng.choice(['-', '*', '+'])} item with `code{rng.randint(0, 3)}`\n")
+        elif kind < 0.6:
+            pieces.append(f"See https://ex.com/{rng.randint(0, 9)} and src/mod{rng.randint(0, 9)}.py\n")
+        else:
+            pieces.append(rng.choice(["Prose line.\n", "\n", "a/b c\\d e\n"]))
+    return "".join(pieces)
+
+
+def assert_matches_extractors(text):
+    s = parse_markdown(text)
+    assert s.headings == extract_headings(text)
+    assert s.code_blocks == extract_code_blocks(text)
+    assert s.urls == extract_urls(text)
+    assert s.paths == set(PATH_REGEX.findall(text))
+    assert s.bullets == count_bullets(text)
+    assert Counter(s.inline_codes) == Counter(extract_inline_codes(text))
+
+
+@pytest.mark.parametrize("text", SAMPLES)
+def test_parse_markdown_matches_extractors(text):
+    assert_matches_extractors(text)
+
+
+def test_parse_markdown_matches_extractors_on_random_documents():
+    rng = random.Random(8)
+    for _ in range(300):
+        assert_matches_extractors(_random_doc(rng))
+
+
+def test_find_paths_matches_full_regex_scan():
+    rng = random.Random(80)
+    for _ in range(300):
+        text = _random_doc(rng)
+        assert find_paths(text) == PATH_REGEX.findall(text)
+
+
+def test_offsets_point_at_headings_and_blocks():
+    text = SAMPLES[4] + "# Last\n"
+    s = parse_markdown(text)
+    for i, (level, title) in enumerate(s.headings):
+        start, end = s.heading_span(i)
+        assert re.match(rf"{level}\s+{re.escape(title)}", text[start:end])
+    for i, block in enumerate(s.code_blocks):
+        start, end = s.code_block_span(i)
+        assert text[start:end] == block
+
+
+# Where parse_markdown intentionally differs from the old extractors.
+
+
+def test_bare_hash_line_does_not_swallow_next_line():
+    text = "#\nnot a heading\n"
+    assert extract_headings(text) == [("#", "not a heading")]
+    assert parse_markdown(text).headings == []
+
+
+def test_indented_fence_hides_its_inline_code():
+    text = "  ```\n`inside`\n  ```\n`outside`\n"
+    assert extract_inline_codes(text) != ["outside"]  # the fence's own backticks pair up
+    assert parse_markdown(text).inline_codes == ["outside"]
+
+
+def test_longer_fence_hides_its_inline_code():
+    text = "````\n```\n`inside`\n```\n````\n`outside`\n"
+    assert "inside" in extract_inline_codes(text)
+    assert parse_markdown(text).inline_codes == ["outside"]
+
+
+def test_identical_texts_validate():
+    for text in SAMPLES:
+        assert validate_text(text, text).is_valid